@@ -0,0 +1,331 @@
+"""
+Append-only forecast history archive.
+
+Every cache refresh is queued here and written in batches by a background
+task, so the request path only does a non-blocking ``put_nowait``.
+Records are NDJSON lines partitioned by the UTC day they were fetched:
+
+    ARCHIVE_DIR/date=2026-10-19/part-<pid>.ndjson     (open day, one file per worker)
+    ARCHIVE_DIR/date=2026-10-12/compacted.ndjson.gz   (closed day after compaction)
+
+Each worker process appends only to its own part file, so workers never
+interleave writes. Once a day is older than ``compact_after_days`` its parts
+are merged into one gzip file. Days older than ``retention_days`` are
+deleted. Exports stream partition by partition with constant memory,
+holding a shared lock on the archive so maintenance in any worker never
+rewrites a partition while it is being read.
+"""
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import metrics
+from .responses import dumps
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+if orjson is not None:
+    loads = orjson.loads
+else:  # pragma: no cover - exercised only without orjson
+    import json
+    loads = json.loads
+
+PARTITION_PREFIX = "date="
+COMPACTED_NAME = "compacted.ndjson.gz"
+
+# Hourly row fields exported as CSV columns, after the record fields
+CSV_FIELDS = (
+    "fetched_at", "mountain_id", "band", "time", "temp_c", "wind_speed_kmh", "wind_gust_kmh",
+    "wind_direction_deg", "precip_mm", "snow_likely", "weather_code", "humidity", "cloud_cover",
+)
+
+# How often the writer runs compaction and retention
+MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _partition_dir(directory: Path, day: date) -> Path:
+    return directory / f"{PARTITION_PREFIX}{day.isoformat()}"
+
+
+def _partition_day(path: Path) -> Optional[date]:
+    if not path.is_dir() or not path.name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return date.fromisoformat(path.name[len(PARTITION_PREFIX):])
+    except ValueError:
+        return None
+
+
+class ForecastArchive:
+    """
+    Batched, append-only writer and reader of archived forecasts.
+
+    Args:
+        directory: Archive root (created on first write)
+        batch_size: Records per write; smaller batches flush after ``flush_seconds``
+        flush_seconds: Longest a queued record waits before being written
+        max_queue: Queued records beyond this are dropped (and counted)
+        retention_days: Days of history kept; older partitions are deleted
+        compact_after_days: Days after which a partition is merged and gzipped
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        batch_size: int = 100,
+        flush_seconds: float = 5.0,
+        max_queue: int = 10000,
+        retention_days: int = 90,
+        compact_after_days: int = 2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.retention_days = retention_days
+        # Today's partition is still being written to
+        self.compact_after_days = max(1, compact_after_days)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- writing -----------------------------------------------------
+
+    def record(
+        self,
+        mountain_id: str,
+        band: str,
+        fetched_at: datetime,
+        horizon_hours: int,
+        rows: List[Dict[str, Any]],
+    ) -> None:
+        """Queue one refreshed forecast; a no-op unless the writer is running."""
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait({
+                "fetched_at": fetched_at.astimezone(timezone.utc).isoformat(),
+                "mountain_id": mountain_id,
+                "band": band,
+                "horizon_hours": horizon_hours,
+                "rows": rows,
+            })
+        except asyncio.QueueFull:
+            metrics.ARCHIVE_RECORDS.labels("dropped").inc()
+
+    async def start(self) -> None:
+        """Start the background writer (call from the running event loop)."""
+        self._queue = asyncio.Queue(self.max_queue)
+        self._task = asyncio.create_task(self._run(self._queue))
+
+    async def stop(self) -> None:
+        """Write everything still queued and stop the writer."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        queue, self._queue = self._queue, None
+        if not task.done():
+            # The None sentinel may wait for room behind a full queue; stop
+            # waiting if the writer dies meanwhile
+            put = asyncio.ensure_future(queue.put(None))
+            await asyncio.wait({put, task}, return_when=asyncio.FIRST_COMPLETED)
+            put.cancel()
+        try:
+            await task
+        except Exception:
+            logger.exception("Archive writer stopped with an error")
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        last_maintenance = 0.0
+        while True:
+            item = await queue.get()
+            batch = [] if item is None else [item]
+            deadline = loop.time() + self.flush_seconds
+            while item is not None and len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is not None:
+                    batch.append(item)
+            if batch:
+                try:
+                    await asyncio.to_thread(self.write_batch, batch)
+                except Exception:
+                    # Keep the writer alive; the next batch may succeed
+                    logger.exception("Failed to write %d archive records", len(batch))
+                    metrics.ARCHIVE_RECORDS.labels("failed").inc(len(batch))
+            if item is None:
+                return
+            if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL_SECONDS:
+                last_maintenance = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.maintain)
+                except Exception:
+                    logger.exception("Archive maintenance failed")
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Append records to this process's part file of each record's day."""
+        by_day: Dict[str, List[bytes]] = {}
+        for r in records:
+            by_day.setdefault(r["fetched_at"][:10], []).append(dumps(r) + b"\n")
+        for day, lines in by_day.items():
+            part = _partition_dir(self.directory, date.fromisoformat(day))
+            part.mkdir(parents=True, exist_ok=True)
+            with open(part / f"part-{os.getpid()}.ndjson", "ab") as f:
+                f.write(b"".join(lines))
+        metrics.ARCHIVE_RECORDS.labels("written").inc(len(records))
+
+    # ---- maintenance -------------------------------------------------
+
+    @contextmanager
+    def _lock(self, shared: bool) -> Iterator[bool]:
+        """
+        Hold the archive-wide maintenance lock across processes. Readers
+        wait for a shared lock; maintenance takes it exclusively and yields
+        False instead of waiting when readers or another worker hold it.
+        """
+        with open(self.directory / ".maintenance.lock", "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+            yield True
+
+    def maintain(self, today: Optional[date] = None) -> Dict[str, int]:
+        """
+        Apply retention and compaction.
+
+        Only one process maintains the archive at a time, and not while an
+        export is reading; otherwise this pass is skipped.
+
+        Returns:
+            ``{"deleted": partitions removed, "compacted": partitions merged}``
+        """
+        result = {"deleted": 0, "compacted": 0}
+        if not self.directory.is_dir():
+            return result
+        today = today or datetime.now(timezone.utc).date()
+        with self._lock(shared=False) as locked:
+            if not locked:
+                return result
+            for path in sorted(self.directory.iterdir()):
+                day = _partition_day(path)
+                if day is None:
+                    continue
+                age = (today - day).days
+                if age > self.retention_days:
+                    shutil.rmtree(path)
+                    result["deleted"] += 1
+                elif age >= self.compact_after_days and any(path.glob("part-*.ndjson")):
+                    self._compact(path)
+                    result["compacted"] += 1
+        return result
+
+    @staticmethod
+    def _compact(path: Path) -> None:
+        parts = sorted(path.glob("part-*.ndjson"))
+        compacted = path / COMPACTED_NAME
+        tmp = path / f"{COMPACTED_NAME}.tmp"
+        with gzip.open(tmp, "wb") as out:
+            sources = ([compacted] if compacted.exists() else []) + parts
+            for src in sources:
+                opener = gzip.open if src.suffix == ".gz" else open
+                with opener(src, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        tmp.replace(compacted)
+        for part in parts:
+            part.unlink()
+
+    # ---- reading -----------------------------------------------------
+
+    def iter_records(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        mountain_id: Optional[str] = None,
+        band: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Archived records fetched between ``start`` and ``end`` (inclusive UTC
+        days), oldest partition first, reading one line at a time.
+        """
+        if not self.directory.is_dir():
+            return
+        days = sorted(
+            (day, path) for path in self.directory.iterdir()
+            if (day := _partition_day(path)) is not None
+            and (start is None or day >= start)
+            and (end is None or day <= end)
+        )
+        for _, path in days:
+            # Files are listed under the lock so compaction can't move
+            # records between them mid-read
+            with self._lock(shared=True):
+                files = sorted(path.glob(COMPACTED_NAME)) + sorted(path.glob("part-*.ndjson"))
+                for src in files:
+                    opener = gzip.open if src.suffix == ".gz" else open
+                    try:
+                        f = opener(src, "rb")
+                    except FileNotFoundError:
+                        # Only possible without fcntl (no lock to wait on)
+                        continue
+                    with f:
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                # Tail of a batch another worker is still appending
+                                break
+                            record = loads(line)
+                            if mountain_id is not None and record["mountain_id"] != mountain_id:
+                                continue
+                            if band is not None and record["band"] != band:
+                                continue
+                            yield record
+
+
+def iter_ndjson(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """One NDJSON line per archived record."""
+    for record in records:
+        yield dumps(record) + b"\n"
+
+
+def iter_csv(records: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """A header, then one CSV row per forecast hour of each record."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_FIELDS)
+    for record in records:
+        for row in record["rows"]:
+            writer.writerow(
+                [record["fetched_at"], record["mountain_id"], record["band"]]
+                + [row.get(name) for name in CSV_FIELDS[3:]]
+            )
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
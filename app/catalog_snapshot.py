@@ -0,0 +1,125 @@
+"""
+Precompiled peak catalog.
+
+``spanish_pyrenees.json`` is compiled at image build time into a pickle
+holding the parsed areas plus the derived lookups the API needs (peaks by
+id, the ``peaks_all`` rows with lower-cased search keys), so startup loads
+one pickle instead of parsing JSON and rebuilding indexes. The snapshot
+records the size and mtime of its source and is ignored if the JSON no
+longer matches, in which case the catalog is compiled in memory as before.
+Either way this is well under a millisecond, against about a second of
+importing the framework, so the snapshot is not what makes cold starts fast.
+
+Build: python -m app.catalog_snapshot
+"""
+import json
+import os
+import pathlib
+import pickle
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+CATALOG_DIR = pathlib.Path(__file__).resolve().parent / "catalog"
+CATALOG_PATH = CATALOG_DIR / "spanish_pyrenees.json"
+SNAPSHOT_PATH = CATALOG_DIR / "spanish_pyrenees.pickle"
+
+# Bump when the Catalog layout changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class Catalog:
+    areas: List[Dict[str, Any]]
+    peak_by_id: Dict[str, Dict[str, Any]]
+    # (name lower, massif lower, peaks_all row) in catalog order
+    search_rows: List[Tuple[str, str, Dict[str, Any]]]
+
+    def iter_peaks(self):
+        for area in self.areas:
+            for massif in area["massifs"]:
+                for peak in massif["peaks"]:
+                    yield area, massif, peak
+
+
+def compile_catalog(raw: Dict[str, Any]) -> Catalog:
+    """Build the catalog lookups from parsed catalog JSON."""
+    areas = raw["areas"]
+    peaks = [p for a in areas for m in a["massifs"] for p in m["peaks"]]
+    return Catalog(
+        areas=areas,
+        peak_by_id={p["id"]: p for p in peaks},
+        search_rows=[
+            (
+                p["name"].lower(),
+                p.get("massif", "").lower(),
+                {"id": p["id"], "name": p["name"], "summit_elev_m": p["summit_elev_m"], "massif": p.get("massif")},
+            )
+            for p in peaks
+        ],
+    )
+
+
+def _source_stamp(json_path: pathlib.Path) -> Tuple[int, int]:
+    st = os.stat(json_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def build_snapshot(json_path: pathlib.Path = CATALOG_PATH, snapshot_path: pathlib.Path = SNAPSHOT_PATH) -> None:
+    """Compile ``json_path`` and write the snapshot atomically."""
+    stamp = _source_stamp(json_path)
+    data = {
+        "format": SNAPSHOT_FORMAT,
+        "source_stamp": stamp,
+        "catalog": compile_catalog(json.loads(json_path.read_bytes())),
+    }
+    tmp = snapshot_path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(snapshot_path)
+
+
+def _read_snapshot(snapshot_path: pathlib.Path, stamp: Tuple[int, int]) -> Optional[Catalog]:
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("format") != SNAPSHOT_FORMAT
+        or data.get("source_stamp") != stamp
+    ):
+        return None
+    return data["catalog"]
+
+
+def load_catalog(
+    json_path: pathlib.Path = CATALOG_PATH, snapshot_path: pathlib.Path = SNAPSHOT_PATH
+) -> Tuple[Catalog, bool]:
+    """
+    Load the catalog, preferring an up-to-date snapshot.
+
+    Returns:
+        ``(catalog, from_snapshot)``
+    """
+    catalog = _read_snapshot(snapshot_path, _source_stamp(json_path))
+    if catalog is not None:
+        return catalog, True
+    return compile_catalog(json.loads(json_path.read_bytes())), False
+
+
+_catalog: Optional[Catalog] = None
+
+
+def get_catalog() -> Catalog:
+    """The process-wide catalog, loaded on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog, _ = load_catalog()
+    return _catalog
+
+
+if __name__ == "__main__":
+    build_snapshot()
+    print(f"wrote {SNAPSHOT_PATH}", file=sys.stderr)
@@ -7,6 +7,26 @@ class Settings(BaseSettings):
     MAX_CONCURRENT_WEATHER_REQUESTS: int = 10
     WEATHER_API_URL: str = "https://api.open-meteo.com/v1/forecast"
     DEBUG: bool = False
+    METRICS_ENABLED: bool = True
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_MAX_STORED: int = 20
+    ADMIN_TOKEN: str | None = None
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    SHARED_CACHE_ENABLED: bool = False
+    SHARED_CACHE_DIR: str | None = None
+    SHARED_CACHE_LOCK_TIMEOUT: float = 60.0
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_DIR: str = "./archive"
+    ARCHIVE_BATCH_SIZE: int = 100
+    ARCHIVE_FLUSH_SECONDS: float = 5.0
+    ARCHIVE_QUEUE_MAX: int = 10000
+    ARCHIVE_RETENTION_DAYS: int = 90
+    ARCHIVE_COMPACT_AFTER_DAYS: int = 2
 
     class Config:
         env_file = ".env"
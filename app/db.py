@@ -1,9 +1,12 @@
 """
 Database connection and session management.
 """
+from typing import Iterable, List, Tuple
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from .config import settings
+from . import metrics, profiling
 
 
 class Base(DeclarativeBase):
@@ -18,6 +21,9 @@ engine = create_async_engine(
     pool_size=5,
     max_overflow=10,
 )
+metrics.instrument_engine(engine)
+if settings.PROFILING_ENABLED:
+    profiling.instrument_engine(engine)
 
 async_session = async_sessionmaker(
     engine, 
@@ -29,4 +35,48 @@ async_session = async_sessionmaker(
 async def get_session():
     """Dependency for getting database sessions."""
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def add_missing_columns(conn, columns: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    ``ALTER TABLE ... ADD COLUMN`` for each ``(table, column)`` the database
+    lacks, typed from the model. ``create_all`` never alters existing tables.
+
+    Returns:
+        ``"table.column"`` for every column added
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    added = []
+    for table_name, column_name in columns:
+        if column_name in {c["name"] for c in inspector.get_columns(table_name)}:
+            continue
+        column = Base.metadata.tables[table_name].c[column_name]
+        conn.exec_driver_sql(
+            f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(column_name)} "
+            f"{column.type.compile(dialect=conn.dialect)}"
+        )
+        added.append(f"{table_name}.{column_name}")
+    return added
+
+async def init_schema(version: int, added_columns: Iterable[Tuple[str, str]] = ()) -> bool:
+    """
+    Create missing tables and add ``added_columns`` to existing ones, unless
+    the database is already at ``version``.
+
+    SQLite databases carry the version in ``PRAGMA user_version``, so warm
+    boots skip ``create_all`` and its per-table reflection. Other backends
+    always run it.
+
+    Returns:
+        True if the schema was checked and migrated
+    """
+    async with engine.begin() as conn:
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite and (await conn.exec_driver_sql("PRAGMA user_version")).scalar() == version:
+            return False
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns, added_columns)
+        if sqlite:
+            await conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+    return True
@@ -1,54 +1,111 @@
-from fastapi import FastAPI, Depends, HTTPException
+from time import perf_counter
+_IMPORT_STARTED = perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Header, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy import select, insert, delete, update
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from sqlalchemy import select, insert, delete
 from sqlalchemy.exc import IntegrityError
-from .db import engine, Base, get_session
-from .models import MyMountain, WeatherCache
-from .weather import fetch_hourly, slice_next_24h
+from .db import get_session, init_schema
+from .models import ADDED_COLUMNS, SCHEMA_VERSION, MyMountain, WeatherCache
+from .catalog_snapshot import get_catalog
+from .weather import (
+    MAX_HORIZON_HOURS, RESOLUTIONS, aggregate_forecast, cell_groups, fetch_hourly, slice_hours, summarize_forecast,
+)
+from .ranking import ScoreCache, hourly_scores, rank_windows
 from .config import settings
-from datetime import datetime, timezone
-from typing import Dict, Any, Optional
-import json
+from . import metrics, profiling
+from .compression import CompressionMiddleware
+from .responses import FastJSONResponse
+from .archive import ForecastArchive, iter_csv, iter_ndjson
+from .shared_cache import SharedForecastCache, default_directory
+from datetime import date, datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
+import logging
 import pathlib
+import time
+
 
+# Hot endpoints return this class directly so FastAPI skips jsonable_encoder
+JSONResponseClass = profiling.TimedJSONResponse if settings.PROFILING_ENABLED else FastJSONResponse
 
-app = FastAPI(title="Pyrenees Mountain Weather")
+logger = logging.getLogger("uvicorn.error")
 
-CATALOG_PATH = pathlib.Path(__file__).resolve().parents[0] / "catalog" / "spanish_pyrenees.json"
-with open(CATALOG_PATH, "r", encoding="utf-8") as f:
-    RAW = json.load(f)
+# Seconds spent in each startup phase, filled in by lifespan
+STARTUP_TIMINGS: Dict[str, float] = {}
 
-AREAS = RAW["areas"]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = perf_counter()
+    STARTUP_TIMINGS["import"] = _IMPORT_FINISHED - _IMPORT_STARTED
 
-def iter_peaks():
-    for area in AREAS:
-        for massif in area["massifs"]:
-            for peak in massif["peaks"]:
-                yield area, massif, peak
+    t = perf_counter()
+    get_catalog()
+    STARTUP_TIMINGS["catalog"] = perf_counter() - t
 
-PEAK_BY_ID = {p["id"]: p for _, _, p in iter_peaks()}
+    t = perf_counter()
+    created = await init_schema(SCHEMA_VERSION, ADDED_COLUMNS)
+    STARTUP_TIMINGS["schema"] = perf_counter() - t
 
-@app.on_event("startup")
-async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    STARTUP_TIMINGS["total"] = STARTUP_TIMINGS["import"] + perf_counter() - started
+    for phase, seconds in STARTUP_TIMINGS.items():
+        metrics.STARTUP_PHASE_DURATION.labels(phase).set(seconds)
+    logger.info(
+        "Startup phases: %s (schema %s)",
+        ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in STARTUP_TIMINGS.items()),
+        "created" if created else f"already at version {SCHEMA_VERSION}",
+    )
+    if settings.ARCHIVE_ENABLED:
+        await ARCHIVE.start()
+    yield
+    # Flush archive records still queued
+    await ARCHIVE.stop()
 
+app = FastAPI(title="Pyrenees Mountain Weather", default_response_class=JSONResponseClass, lifespan=lifespan)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+PROFILES = profiling.ProfileStore(settings.PROFILING_MAX_STORED)
+ARCHIVE = ForecastArchive(
+    settings.ARCHIVE_DIR,
+    batch_size=settings.ARCHIVE_BATCH_SIZE,
+    flush_seconds=settings.ARCHIVE_FLUSH_SECONDS,
+    max_queue=settings.ARCHIVE_QUEUE_MAX,
+    retention_days=settings.ARCHIVE_RETENTION_DAYS,
+    compact_after_days=settings.ARCHIVE_COMPACT_AFTER_DAYS,
+)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        profiling.ProfilingMiddleware,
+        store=PROFILES,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        header=settings.PROFILING_HEADER,
+        token=settings.ADMIN_TOKEN,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 @app.get("/api/catalog/areas")
 def list_areas():
-    return [{"id": a["id"], "name": a["name"]} for a in AREAS]
+    return [{"id": a["id"], "name": a["name"]} for a in get_catalog().areas]
 
 @app.get("/api/catalog/massifs")
 def list_massifs(area: str):
-    for a in AREAS:
+    for a in get_catalog().areas:
         if a["id"] == area:
             return [{"id": m["id"], "name": m["name"]} for m in a["massifs"]]
     raise HTTPException(404, "Unknown area")
 
 @app.get("/api/catalog/peaks")
 def list_peaks(area: str, massif: str, q: str | None = None):
-    for a in AREAS:
+    for a in get_catalog().areas:
         if a["id"] == area:
             for m in a["massifs"]:
                 if m["id"] == massif:
@@ -61,18 +118,15 @@ def list_peaks(area: str, massif: str, q: str | None = None):
 
 @app.get("/api/catalog/peaks_all")
 def list_peaks_all(q: str | None = None):
-    items = [p for _, _, p in iter_peaks()]
+    rows = get_catalog().search_rows
     if q:
         qn = q.lower()
-        items = [p for p in items if qn in p["name"].lower() or qn in p.get("massif", "").lower()]
-    return [
-        {"id": p["id"], "name": p["name"], "summit_elev_m": p["summit_elev_m"], "massif": p.get("massif")}
-        for p in items
-    ]
+        return JSONResponseClass([row for name, massif, row in rows if qn in name or qn in massif])
+    return JSONResponseClass([row for _, _, row in rows])
 
 @app.get("/api/catalog/peaks/{peak_id}")
 def peak_details(peak_id: str):
-    p = PEAK_BY_ID.get(peak_id)
+    p = get_catalog().peak_by_id.get(peak_id)
     if not p:
         raise HTTPException(404, "Unknown peak")
     return p
@@ -88,7 +142,7 @@ async def my_mountains(session=Depends(get_session)):
 
 @app.post("/api/my/mountains/{mountain_id}")
 async def add_mountain(mountain_id: str, session=Depends(get_session)):
-    if mountain_id not in PEAK_BY_ID:
+    if mountain_id not in get_catalog().peak_by_id:
         raise HTTPException(404, "Unknown peak")
     try:
         await session.execute(insert(MyMountain).values(mountain_id=mountain_id))
@@ -110,69 +164,319 @@ def is_cache_fresh(row: Optional[WeatherCache]) -> bool:
     try:
         if not row or row.fetched_at is None or row.ttl_seconds is None:
             return False
-        age = (datetime.now(timezone.utc) - row.fetched_at).total_seconds()
+        fetched_at = row.fetched_at
+        if fetched_at.tzinfo is None:
+            # SQLite drops tzinfo on read; values are always written in UTC
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - fetched_at).total_seconds()
         return age < row.ttl_seconds
     except Exception:
         return False
 
-async def fetch_and_process_weather(lat: float, lon: float, elev_m: int) -> list[Dict[str, Any]]:
+BANDS = ("base", "mid", "summit")
+
+async def fetch_and_process_weather(peak: Dict[str, Any], hours: int = 24) -> Dict[str, list[Dict[str, Any]]]:
+    """
+    Fetch one forecast per grid cell of the peak's band points (bands close
+    together share a fetch) and correct each band to its own elevation.
+    """
+    bands = peak["bands"]
+    groups = cell_groups({name: bands[name] for name in BANDS})
     try:
-        payload = await fetch_hourly(lat, lon)
-        return slice_next_24h(payload, elev_target_m=elev_m)
+        payloads = await asyncio.gather(
+            *(fetch_hourly(lat, lon, forecast_hours=hours) for (lat, lon), _ in groups)
+        )
+        by_band = {
+            name: slice_hours(payload, elev_target_m=bands[name]["elev_m"], hours=hours)
+            for (_, names), payload in zip(groups, payloads)
+            for name in names
+        }
+        return {name: by_band[name] for name in BANDS}
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Upstream weather error: {e}")
 
-async def update_weather_cache(session, mountain_id: str, band: str, hourly_data: list[Dict[str, Any]]) -> None:
+async def update_weather_cache(
+    session, mountain_id: str, by_band: Dict[str, list[Dict[str, Any]]], horizon_hours: int = 24
+) -> Dict[str, Dict[str, Any]]:
+    """Replace the cache rows of every band of a mountain in one transaction."""
     now_utc = datetime.now(timezone.utc)
+    values = {
+        band: {
+            "payload": hourly_data,
+            "horizon_hours": horizon_hours,
+            "summary": summarize_forecast(hourly_data),
+            "scores": {"times": [r["time"] for r in hourly_data], "scores": hourly_scores(hourly_data)},
+            "ttl_seconds": TTL_SECONDS,
+            "fetched_at": now_utc,
+        }
+        for band, hourly_data in by_band.items()
+    }
+    # One write transaction per refresh rather than one per band keeps
+    # SQLite's single writer lock free during cache stampedes
     try:
+        await session.execute(delete(WeatherCache).where(WeatherCache.mountain_id == mountain_id))
         await session.execute(
-            insert(WeatherCache).values(
-                mountain_id=mountain_id,
-                band=band,
-                payload=hourly_data,
-                ttl_seconds=TTL_SECONDS,
-                fetched_at=now_utc,
-            )
+            insert(WeatherCache),
+            [{"mountain_id": mountain_id, "band": band, **v} for band, v in values.items()],
         )
         await session.commit()
     except IntegrityError:
+        # A concurrent refresh committed the same rows first (and archived them)
         await session.rollback()
-        await session.execute(
-            update(WeatherCache)
-            .where(
-                WeatherCache.mountain_id == mountain_id,
-                WeatherCache.band == band,
-            )
-            .values(payload=hourly_data, ttl_seconds=TTL_SECONDS, fetched_at=now_utc)
-        )
-        await session.commit()
+        return values
+    for band, v in values.items():
+        ARCHIVE.record(mountain_id, band, now_utc, horizon_hours, v["payload"])
+    return values
+
+SHARED_CACHE = (
+    SharedForecastCache(settings.SHARED_CACHE_DIR or default_directory(), settings.SHARED_CACHE_LOCK_TIMEOUT)
+    if settings.SHARED_CACHE_ENABLED else None
+)
+
+def forecast_validity(forecast: Dict[str, Any]) -> Tuple[float, float]:
+    """``(fetched_at, expires_at)`` in epoch seconds for a get_forecasts entry."""
+    if "expires_at" in forecast:
+        # Shared cache entries already carry epoch timestamps
+        return forecast["fetched_at"], forecast["expires_at"]
+    fetched_at = forecast["fetched_at"]
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return fetched_at.timestamp(), fetched_at.timestamp() + forecast["ttl_seconds"]
+
+def shared_forecasts(mountain_id: str, band: str, horizon_hours: int) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    All bands from the shared cache, or None unless every band is fresh and
+    ``band`` is long enough (callers expect a complete set of bands).
+    """
+    entries = {}
+    for name in BANDS:
+        entry = SHARED_CACHE.get(mountain_id, name)
+        if entry is None:
+            return None
+        entries[name] = entry
+    if entries[band]["horizon_hours"] < horizon_hours:
+        return None
+    return entries
+
+async def get_forecasts(
+    session, mountain_id: str, peak: Dict[str, Any], band: str, horizon_hours: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Return ``{band: {"payload", "summary"}}`` for every band of the peak,
+    refreshing all bands from upstream when any band is missing or stale,
+    or ``band`` is shorter than ``horizon_hours``.
+
+    With the shared cache enabled, workers first look in the host-wide
+    cache and refresh under a cross-process lock, so one worker goes to the
+    database/upstream while the others wait and then read its result.
+    """
+    if SHARED_CACHE is None:
+        return await load_forecasts(session, mountain_id, peak, horizon_hours)
+
+    forecasts = shared_forecasts(mountain_id, band, horizon_hours)
+    if forecasts is None:
+        async with SHARED_CACHE.refresh_lock(mountain_id):
+            # Another worker may have refreshed while we waited
+            forecasts = shared_forecasts(mountain_id, band, horizon_hours)
+            if forecasts is None:
+                forecasts = await load_forecasts(session, mountain_id, peak, horizon_hours)
+                for name, f in forecasts.items():
+                    fetched_at, expires_at = forecast_validity(f)
+                    SHARED_CACHE.put(
+                        mountain_id, name, f["payload"], f["summary"],
+                        f["horizon_hours"], fetched_at, expires_at - fetched_at,
+                    )
+                return forecasts
+    metrics.WEATHER_CACHE_REQUESTS.labels("shared").inc()
+    return forecasts
+
+async def load_forecasts(
+    session, mountain_id: str, peak: Dict[str, Any], horizon_hours: int
+) -> Dict[str, Dict[str, Any]]:
+    """get_forecasts backed by the database cache and upstream only."""
+    rows = {
+        r.band: r
+        for r in (
+            await session.execute(select(WeatherCache).where(WeatherCache.mountain_id == mountain_id))
+        ).scalars()
+    }
+
+    # The cache keeps the longest horizon fetched so far; shorter windows
+    # are served as slices of it. Callers expect every band, so rows left
+    # from per-band refreshes only count as a hit when all are usable.
+    if any(name not in rows for name in BANDS):
+        outcome = "miss"
+    elif not all(is_cache_fresh(rows[name]) for name in BANDS):
+        outcome = "stale"
+    elif any((rows[name].horizon_hours or len(rows[name].payload)) < horizon_hours for name in BANDS):
+        outcome = "short"
+    else:
+        outcome = "hit"
+    metrics.WEATHER_CACHE_REQUESTS.labels(outcome).inc()
+    if outcome == "hit":
+        return {
+            name: {
+                "payload": r.payload,
+                "summary": r.summary or summarize_forecast(r.payload),
+                "horizon_hours": r.horizon_hours or len(r.payload),
+                "fetched_at": r.fetched_at,
+                "ttl_seconds": r.ttl_seconds,
+            }
+            for name, r in ((name, rows[name]) for name in BANDS)
+        }
+
+    # One upstream call refreshes all bands, so keep the longest horizon
+    # any of them had
+    fetch_hours = max([horizon_hours] + [r.horizon_hours or len(r.payload) for r in rows.values()])
+    by_band = await fetch_and_process_weather(peak, fetch_hours)
+    return await update_weather_cache(session, mountain_id, by_band, fetch_hours)
+
+def check_forecast_params(horizon_hours: int, resolution: str) -> None:
+    if not 1 <= horizon_hours <= MAX_HORIZON_HOURS:
+        raise HTTPException(400, f"horizon_hours must be between 1 and {MAX_HORIZON_HOURS}")
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(400, "resolution must be hourly|3-hourly|daily")
+
+def cached_json(request: Request, version: str, expires_at: float, render) -> Response:
+    """
+    JSON response with an ETag for ``version`` and a max-age of the
+    remaining cache TTL; answers 304 without rendering when the client
+    already has this version.
+    """
+    etag = 'W/"%s"' % hashlib.blake2b(version.encode(), digest_size=12).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max(0, int(expires_at - time.time()))}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponseClass(render(), headers=headers)
 
 @app.get("/api/weather/{mountain_id}")
-async def weather_24h(mountain_id: str, band: str = "base", session=Depends(get_session)):
-    m = PEAK_BY_ID.get(mountain_id)
+async def weather_24h(
+    request: Request,
+    mountain_id: str,
+    band: str = "base",
+    horizon_hours: int = 24,
+    resolution: str = "hourly",
+    session=Depends(get_session),
+):
+    m = get_catalog().peak_by_id.get(mountain_id)
     if not m:
         raise HTTPException(404, "Unknown peak")
-    if band not in ("base", "mid", "summit"):
+    if band not in BANDS:
         raise HTTPException(400, "band must be base|mid|summit")
+    check_forecast_params(horizon_hours, resolution)
+
+    forecasts = await get_forecasts(session, mountain_id, m, band, horizon_hours)
+    forecast = forecasts[band]
+    fetched_at, expires_at = forecast_validity(forecast)
+    return cached_json(
+        request,
+        f"{mountain_id}:{band}:{horizon_hours}:{resolution}:{fetched_at}",
+        expires_at,
+        lambda: aggregate_forecast(forecast["payload"][:horizon_hours], resolution),
+    )
+
+@app.get("/api/weather/{mountain_id}/bands")
+async def weather_all_bands(
+    request: Request,
+    mountain_id: str,
+    horizon_hours: int = 24,
+    resolution: str = "hourly",
+    session=Depends(get_session),
+):
+    """Every band's forecast and summary in one response (one refresh covers all bands)."""
+    m = get_catalog().peak_by_id.get(mountain_id)
+    if not m:
+        raise HTTPException(404, "Unknown peak")
+    check_forecast_params(horizon_hours, resolution)
 
-    b = m["bands"][band]
+    forecasts = await get_forecasts(session, mountain_id, m, "base", horizon_hours)
+    validity = [forecast_validity(f) for f in forecasts.values()]
+    fetched_at = max(v[0] for v in validity)
+    return cached_json(
+        request,
+        f"{mountain_id}:*:{horizon_hours}:{resolution}:{fetched_at}",
+        min(v[1] for v in validity),
+        lambda: {
+            "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+            "bands": {
+                name: aggregate_forecast(f["payload"][:horizon_hours], resolution) for name, f in forecasts.items()
+            },
+            "summary": {name: f["summary"] for name, f in forecasts.items()},
+        },
+    )
 
-    row = (
+@app.get("/api/weather/{mountain_id}/summary")
+async def weather_summary(mountain_id: str, session=Depends(get_session)):
+    m = get_catalog().peak_by_id.get(mountain_id)
+    if not m:
+        raise HTTPException(404, "Unknown peak")
+    forecasts = await get_forecasts(session, mountain_id, m, "base", 24)
+    return {name: f["summary"] for name, f in forecasts.items()}
+
+SCORES = ScoreCache()
+
+@app.get("/api/my/best-windows")
+async def best_windows(k: int = 10, window_hours: int = 3, session=Depends(get_session)):
+    if not 1 <= k <= 100:
+        raise HTTPException(400, "k must be between 1 and 100")
+    if not 1 <= window_hours <= 24:
+        raise HTTPException(400, "window_hours must be between 1 and 24")
+
+    saved = (await session.execute(select(MyMountain.mountain_id))).scalars().all()
+    rows = (
         await session.execute(
-            select(WeatherCache).where(
-                WeatherCache.mountain_id == mountain_id,
-                WeatherCache.band == band,
-            )
+            select(WeatherCache.mountain_id, WeatherCache.band, WeatherCache.fetched_at)
+            .join(MyMountain, MyMountain.mountain_id == WeatherCache.mountain_id)
         )
-    ).scalars().first()
-    
-    if row and is_cache_fresh(row):
-        return row.payload
+    ).all()
 
-    hourly_data = await fetch_and_process_weather(b["lat"], b["lon"], b["elev_m"])
-    await update_weather_cache(session, mountain_id, band, hourly_data)
-    
-    return hourly_data
+    # Decode stored scores only for rows refreshed since they were last seen
+    missing = [(m_id, band) for m_id, band, fetched_at in rows if SCORES.get((m_id, band), fetched_at) is None]
+    if missing:
+        missing_ids = {m_id for m_id, _ in missing}
+        for m_id, band, scores, fetched_at in (
+            await session.execute(
+                select(WeatherCache.mountain_id, WeatherCache.band, WeatherCache.scores, WeatherCache.fetched_at)
+                .where(WeatherCache.mountain_id.in_(missing_ids))
+            )
+        ).all():
+            if scores:
+                SCORES.put((m_id, band), fetched_at, scores["times"], scores["scores"])
+
+    # Ranks what is already cached; hours before now are skipped
+    now_utc = datetime.now(timezone.utc)
+    peak_by_id = get_catalog().peak_by_id
+    entries = []
+    series = []
+    for mountain_id, band, fetched_at in rows:
+        cached = SCORES.get((mountain_id, band), fetched_at)
+        if cached is None or mountain_id not in peak_by_id:
+            continue
+        times, scores = cached
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        skip = max(0, int((now_utc - fetched_at).total_seconds() // 3600))
+        entries.append((mountain_id, band, times))
+        series.append((scores, skip))
+
+    windows = []
+    # Bands of one peak share forecast hours, so one good stretch is listed once per peak
+    groups = [mountain_id for mountain_id, _, _ in entries]
+    for i, start, score in rank_windows(series, k, window_hours, groups):
+        mountain_id, band, times = entries[i]
+        peak = peak_by_id[mountain_id]
+        windows.append({
+            "mountain_id": mountain_id,
+            "name": peak["name"],
+            "band": band,
+            "elev_m": peak["bands"][band]["elev_m"],
+            "start": times[start],
+            "end": times[start + window_hours - 1],
+            "hours": window_hours,
+            "score": score,
+        })
+    scored = {mountain_id for mountain_id, _, _ in entries}
+    return {"windows": windows, "unscored": [m for m in saved if m not in scored]}
 
 @app.get("/health")
 def health_check():
@@ -182,6 +486,73 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(404, "Metrics disabled")
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    if settings.ADMIN_TOKEN is not None and x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(403, "Invalid admin token")
+
+def require_admin_token(x_admin_token: str | None = Header(default=None)):
+    """require_admin for bulk data: refused outright while no ADMIN_TOKEN is configured."""
+    if settings.ADMIN_TOKEN is None:
+        raise HTTPException(403, "Set ADMIN_TOKEN to enable this endpoint")
+    require_admin(x_admin_token)
+
+def require_profiling_admin(x_admin_token: str | None = Header(default=None)):
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(404, "Profiling disabled")
+    require_admin_token(x_admin_token)
+
+@app.get("/api/admin/profiles", include_in_schema=False, dependencies=[Depends(require_profiling_admin)])
+def list_profiles():
+    return PROFILES.list()
+
+@app.get("/api/admin/profiles/{profile_id}", include_in_schema=False, dependencies=[Depends(require_profiling_admin)])
+def get_profile(profile_id: int):
+    p = PROFILES.get(profile_id)
+    if not p:
+        raise HTTPException(404, "Unknown profile")
+    return p
+
+def parse_day(value: str | None, name: str) -> date | None:
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be a date (YYYY-MM-DD)")
+
+@app.get("/api/admin/archive/export", include_in_schema=False, dependencies=[Depends(require_admin_token)])
+def export_archive(
+    format: str = "ndjson",
+    mountain_id: str | None = None,
+    band: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+):
+    """Stream archived forecasts fetched between start and end (inclusive UTC days)."""
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(400, "format must be ndjson|csv")
+    if mountain_id is not None and mountain_id not in get_catalog().peak_by_id:
+        raise HTTPException(404, "Unknown peak")
+    if band is not None and band not in BANDS:
+        raise HTTPException(400, "band must be base|mid|summit")
+    records = ARCHIVE.iter_records(parse_day(start, "start"), parse_day(end, "end"), mountain_id, band)
+    if format == "csv":
+        return StreamingResponse(
+            iter_csv(records),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="forecast-archive.csv"'},
+        )
+    return StreamingResponse(iter_ndjson(records), media_type="application/x-ndjson")
+
 PUBLIC_DIR = pathlib.Path(__file__).resolve().parents[1] / "public"
 INDEX_PATH = PUBLIC_DIR / "index.html"
 
@@ -189,4 +560,15 @@ INDEX_PATH = PUBLIC_DIR / "index.html"
 def index():
     return FileResponse(INDEX_PATH)
 
-app.mount("/static", StaticFiles(directory=str(PUBLIC_DIR)), name="static")
\ No newline at end of file
+# Served from the root so the worker's scope covers the page and /api
+@app.get("/sw.js", include_in_schema=False)
+def service_worker():
+    return FileResponse(
+        PUBLIC_DIR / "sw.js",
+        media_type="application/javascript",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+app.mount("/static", StaticFiles(directory=str(PUBLIC_DIR)), name="static")
+
+_IMPORT_FINISHED = perf_counter()
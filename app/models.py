@@ -7,6 +7,19 @@ from sqlalchemy import Column, Integer, String, JSON, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
 from .db import Base
 
+# Bump whenever a model changes. Databases at another version get
+# create_all (new tables) and ADDED_COLUMNS (new columns); anything else,
+# such as renamed or dropped columns, needs its own migration step
+SCHEMA_VERSION = 1
+
+# (table, column) added after the table first shipped; init_schema adds
+# them to databases created by older releases
+ADDED_COLUMNS = (
+    ("weather_cache", "horizon_hours"),
+    ("weather_cache", "summary"),
+    ("weather_cache", "scores"),
+)
+
 
 class MyMountain(Base):
     """
@@ -27,7 +40,9 @@ class WeatherCache(Base):
     """
     Weather forecast cache with TTL.
     
-    Stores 24-hour forecast as JSON blob to reduce API calls.
+    Stores the processed hourly forecast as JSON blob to reduce API calls.
+    The payload holds the longest horizon fetched for the band; shorter
+    requests are served as slices of it.
     Unique constraint on (mountain_id, band) ensures one cache per elevation band.
     """
     __tablename__ = "weather_cache"
@@ -35,7 +50,10 @@ class WeatherCache(Base):
     id = Column(Integer, primary_key=True)
     mountain_id = Column(String, nullable=False)
     band = Column(String, nullable=False)  # base | mid | summit
-    payload = Column(JSON, nullable=False)  # Full 24-hour forecast
+    payload = Column(JSON, nullable=False)  # Hourly rows, longest horizon fetched
+    horizon_hours = Column(Integer, default=24)  # Hours requested upstream for payload
+    summary = Column(JSON)  # Per-band stats, computed on refresh
+    scores = Column(JSON)  # {"times": [...], "scores": [...]} climbing score per hour
     fetched_at = Column(DateTime(timezone=True), server_default=func.now())
     ttl_seconds = Column(Integer, default=3600)  # Cache lifetime
 
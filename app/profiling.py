@@ -0,0 +1,214 @@
+"""
+Opt-in per-request profiling.
+
+When ``PROFILING_ENABLED`` is set, requests carrying the profiling header
+(or picked by ``PROFILING_SAMPLE_RATE``) run under cProfile, and the time
+spent in DB statements, upstream fetches and response serialization is
+recorded alongside the profile. The last ``PROFILING_MAX_STORED`` profiles
+are kept in memory for the admin endpoints.
+
+When profiling is disabled none of this is installed: no middleware, no
+SQLAlchemy listeners and the stock response class, so there is no cost.
+"""
+import cProfile
+import io
+import itertools
+import pstats
+import random
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from .responses import FastJSONResponse
+
+STATS_LIMIT = 40
+
+
+class RequestTimings:
+    """Accumulated time per category for one profiled request."""
+    __slots__ = ("db", "db_queries", "upstream", "upstream_calls", "serialization")
+
+    def __init__(self) -> None:
+        self.db = 0.0
+        self.db_queries = 0
+        self.upstream = 0.0
+        self.upstream_calls = 0
+        self.serialization = 0.0
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("profiling_timings", default=None)
+
+
+def record_upstream(seconds: float) -> None:
+    """Add an upstream call to the current profiled request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.upstream += seconds
+        timings.upstream_calls += 1
+
+
+class ProfileStore:
+    """Bounded in-memory store of the most recent request profiles."""
+
+    def __init__(self, max_items: int) -> None:
+        self._items: Deque[Dict[str, Any]] = deque(maxlen=max_items)
+        self._ids = itertools.count(1)
+
+    def add(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        profile["id"] = next(self._ids)
+        self._items.append(profile)
+        return profile
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first, without stats text."""
+        return [{k: v for k, v in p.items() if k != "stats"} for p in reversed(self._items)]
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        for p in self._items:
+            if p["id"] == profile_id:
+                return p
+        return None
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests.
+
+    cProfile hooks the whole thread, so while a request is being profiled
+    other requests interleaved on the event loop show up in its stats too.
+    Only one request is profiled at a time; others selected meanwhile run
+    unprofiled.
+
+    Requests are selected by sampling, or by the profiling header carrying
+    ``token``. Without a token the header is ignored.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        header: str = "x-profile",
+        token: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode("latin-1")
+        self.token = token
+        self._active = False
+
+    def _selected(self, scope: Dict[str, Any]) -> bool:
+        if self.token is not None:
+            for name, value in scope.get("headers", ()):
+                if name == self.header:
+                    return value.decode("latin-1") == self.token
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or self._active or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        profiler = cProfile.Profile()
+        self._active = True
+        started_at = datetime.now(timezone.utc)
+        start = perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            total = perf_counter() - start
+            self._active = False
+            _current.reset(token)
+            self.store.add(_build_profile(scope, status, started_at, total, timings, profiler))
+
+
+def _build_profile(
+    scope: Dict[str, Any],
+    status: int,
+    started_at: datetime,
+    total: float,
+    timings: RequestTimings,
+    profiler: cProfile.Profile,
+) -> Dict[str, Any]:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(STATS_LIMIT)
+    route = scope.get("route")
+    other = total - timings.db - timings.upstream - timings.serialization
+    return {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", None),
+        "status": status,
+        "started_at": started_at.isoformat(),
+        "total_ms": round(total * 1e3, 3),
+        "db_ms": round(timings.db * 1e3, 3),
+        "db_queries": timings.db_queries,
+        "upstream_ms": round(timings.upstream * 1e3, 3),
+        "upstream_calls": timings.upstream_calls,
+        "serialization_ms": round(timings.serialization * 1e3, 3),
+        "other_ms": round(max(other, 0.0) * 1e3, 3),
+        "stats": out.getvalue(),
+    }
+
+
+class TimedJSONResponse(FastJSONResponse):
+    """FastJSONResponse that charges body rendering to the profiled request."""
+
+    def render(self, content: Any) -> bytes:
+        timings = _current.get()
+        if timings is None:
+            return super().render(content)
+        start = perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            timings.serialization += perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    starts = conn.info.get("profile_query_start")
+    if timings is not None and starts:
+        timings.db += perf_counter() - starts.pop()
+        timings.db_queries += 1
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("profile_query_start"):
+        conn.info["profile_query_start"].pop()
+
+
+def instrument_engine(engine: Any) -> None:
+    """Charge DB statement time to the profiled request via SQLAlchemy events."""
+    target = getattr(engine, "sync_engine", engine)
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
@@ -0,0 +1,172 @@
+"""
+Climbing-window scoring and ranking.
+
+Each cached forecast hour gets a 0-100 score from wind, precipitation and
+cloud cover when the cache is refreshed. Ranking stacks the stored scores
+of every saved peak and band into one matrix and picks the best windows
+with numpy, so hundreds of peaks x 384 hours rank in a few milliseconds.
+"""
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Gusts at or below WIND_CALM_KMH score full marks, at or above
+# WIND_LIMIT_KMH score zero (roughly where ridge travel gets dangerous)
+WIND_CALM_KMH: float = 20.0
+WIND_LIMIT_KMH: float = 60.0
+# Hourly precipitation at which the precipitation component reaches zero
+PRECIP_LIMIT_MM: float = 2.0
+
+WIND_WEIGHT: float = 0.5
+PRECIP_WEIGHT: float = 0.3
+CLOUD_WEIGHT: float = 0.2
+
+
+def _column(rows: List[Dict[str, Any]], key: str, fallback: Optional[str] = None) -> np.ndarray:
+    values = []
+    for r in rows:
+        v = r.get(key)
+        if v is None and fallback is not None:
+            v = r.get(fallback)
+        values.append(np.nan if v is None else v)
+    return np.array(values, dtype=float)
+
+
+def hourly_scores(rows: List[Dict[str, Any]]) -> List[float]:
+    """
+    Score each processed hourly row for climbing, 0 (bad) to 100 (ideal).
+
+    Args:
+        rows: Hourly rows as returned by slice_hours
+
+    Returns:
+        One score per row, rounded to 1 decimal place. Missing cloud cover
+        counts as half; missing wind and precipitation count as worst case.
+    """
+    if not rows:
+        return []
+    gust = _column(rows, "wind_gust_kmh", fallback="wind_speed_kmh")
+    precip = _column(rows, "precip_mm")
+    cloud = _column(rows, "cloud_cover")
+
+    wind_score = np.clip((WIND_LIMIT_KMH - gust) / (WIND_LIMIT_KMH - WIND_CALM_KMH), 0.0, 1.0)
+    precip_score = np.clip(1.0 - precip / PRECIP_LIMIT_MM, 0.0, 1.0)
+    cloud_score = np.clip(1.0 - cloud / 100.0, 0.0, 1.0)
+
+    score = 100.0 * (
+        WIND_WEIGHT * np.nan_to_num(wind_score, nan=0.0)
+        + PRECIP_WEIGHT * np.nan_to_num(precip_score, nan=0.0)
+        + CLOUD_WEIGHT * np.nan_to_num(cloud_score, nan=0.5)
+    )
+    return np.round(score, 1).tolist()
+
+
+# Fill value for hours that can't be ranked. Any window containing one has
+# a negative mean, so validity needs no separate count.
+_INVALID: float = -1e6
+
+
+class ScoreCache:
+    """
+    Decoded score arrays per ``(mountain_id, band)``.
+
+    Entries are tagged with the cache row's ``fetched_at`` and replaced
+    when the row is refreshed, so JSON scores are decoded once per refresh
+    rather than on every ranking request.
+    """
+
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[str, str], Tuple[Any, List[str], np.ndarray]] = {}
+
+    def get(self, key: Tuple[str, str], version: Any) -> Optional[Tuple[List[str], np.ndarray]]:
+        item = self._items.get(key)
+        if item is None or item[0] != version:
+            return None
+        return item[1], item[2]
+
+    def put(self, key: Tuple[str, str], version: Any, times: List[str], scores: Sequence[float]) -> None:
+        self._items[key] = (version, times, np.asarray(scores, dtype=float))
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+def rank_windows(
+    series: Sequence[Tuple[Sequence[float], int]],
+    k: int,
+    window_hours: int = 1,
+    groups: Optional[Sequence[Hashable]] = None,
+) -> List[Tuple[int, int, float]]:
+    """
+    Find the top-k non-overlapping windows across many hourly score series.
+
+    Args:
+        series: ``(scores, skip)`` per peak/band; the first ``skip`` hours
+            are excluded (already in the past). Scores are 0-100.
+        k: Number of windows to return
+        window_hours: Window length; a window's score is its mean hourly score
+        groups: Group key per series (e.g. the peak of each band). Series of
+            one group share hour indices, and a window overlapping a better
+            one of the same group is dropped. Defaults to one group per series.
+
+    Returns:
+        ``(series_index, start_hour, score)`` tuples, best first
+    """
+    if not series or k <= 0:
+        return []
+    width = max(len(scores) for scores, _ in series)
+    if width < window_hours:
+        return []
+    if groups is None:
+        groups = range(len(series))
+
+    matrix = np.empty((len(series), width + 1))
+    matrix[:, 0] = 0.0
+    lengths = np.array([len(scores) for scores, _ in series])
+    if (lengths == width).all():
+        # Common case: every band was fetched with the same horizon
+        np.stack([scores for scores, _ in series], out=matrix[:, 1:])
+    else:
+        matrix[:, 1:] = _INVALID
+        for i, (scores, _) in enumerate(series):
+            matrix[i, 1:len(scores) + 1] = scores
+    # Skips take few distinct values (hours since each refresh)
+    skips = np.array([skip for _, skip in series])
+    for skip in np.unique(skips[skips > 0]):
+        matrix[skips == skip, 1:skip + 1] = _INVALID
+
+    # Rolling window mean via cumulative sums along each row
+    np.cumsum(matrix, axis=1, out=matrix)
+    means = ((matrix[:, window_hours:] - matrix[:, :-window_hours]) / window_hours).ravel()
+
+    # Each accepted window suppresses at most (2 * window_hours - 1) starts
+    # in every series of its group, so greedy selection over this many of
+    # the best candidates finds the same k windows as over all of them
+    group_size = max(_group_sizes(groups))
+    valid = int(np.count_nonzero(means > -1.0))
+    candidates = min(valid, k * (2 * window_hours - 1) * group_size)
+    if candidates == 0:
+        return []
+    top = np.argpartition(means, -candidates)[-candidates:]
+    top = top[np.argsort(-means[top], kind="stable")]
+
+    n_starts = width - window_hours + 1
+    chosen: Dict[Hashable, List[int]] = {}
+    windows = []
+    for i in top:
+        row, start = int(i // n_starts), int(i % n_starts)
+        taken = chosen.setdefault(groups[row], [])
+        if any(abs(start - other) < window_hours for other in taken):
+            continue
+        taken.append(start)
+        windows.append((row, start, round(max(float(means[i]), 0.0), 1)))
+        if len(windows) == k:
+            break
+    return windows
+
+
+def _group_sizes(groups: Sequence[Hashable]) -> List[int]:
+    sizes: Dict[Hashable, int] = {}
+    for group in groups:
+        sizes[group] = sizes.get(group, 0) + 1
+    return list(sizes.values())
@@ -0,0 +1,37 @@
+"""
+Fast JSON response class.
+
+Uses orjson when it is installed and falls back to a compact stdlib
+``json.dumps`` otherwise. Endpoints on hot paths return these responses
+directly so FastAPI skips ``jsonable_encoder`` for JSON-native content.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+ORJSON_OPTIONS = 0 if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, or compact stdlib json as fallback."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
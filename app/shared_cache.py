@@ -0,0 +1,225 @@
+"""
+Forecast cache shared by all worker processes on one host.
+
+Each ``(mountain_id, band)`` entry is a small file holding a fixed header
+(fetched/expiry timestamps, horizon) followed by the JSON-encoded payload
+and summary. Files live in ``/dev/shm`` when available, so they are
+shared memory rather than disk; readers map them with ``mmap`` and writers
+replace them atomically, so a refresh by one worker is visible to every
+other worker on its next lookup.
+
+Refreshes are single-flight across processes: a worker takes an exclusive
+``flock`` on the mountain's lock file before going to the database or
+upstream, and the kernel drops the lock if that worker dies.
+``SharedSemaphore`` uses the same mechanism to cap concurrent upstream
+requests host-wide instead of per process.
+"""
+import asyncio
+import mmap
+import os
+import random
+import struct
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from .responses import dumps
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+if orjson is not None:
+    loads = orjson.loads
+else:  # pragma: no cover - exercised only without orjson
+    import json
+    loads = json.loads
+
+# magic, format version, fetched_at, expires_at (epoch seconds), horizon hours, body length
+_HEADER = struct.Struct("<4sHddII")
+_MAGIC = b"PYFC"
+_VERSION = 1
+
+# How often a waiter re-tries a lock held by another process
+LOCK_POLL_SECONDS: float = 0.01
+
+
+def default_directory() -> str:
+    """``/dev/shm`` (RAM-backed) when present, else the system temp dir."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "pyrenees-forecast-cache")
+
+
+def _require_fcntl() -> None:
+    if fcntl is None:
+        raise RuntimeError("The shared forecast cache needs fcntl.flock (POSIX only)")
+
+
+async def _flock(fd: int, timeout: Optional[float]) -> bool:
+    """Take an exclusive flock on ``fd`` without blocking the event loop."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+
+
+class SharedForecastCache:
+    """
+    Memory-mapped forecast entries keyed by ``(mountain_id, band)``.
+
+    Args:
+        directory: Directory shared by the workers (created if missing)
+        lock_timeout: Seconds to wait for another worker's refresh before
+            refreshing anyway
+    """
+
+    def __init__(self, directory: str, lock_timeout: float = 60.0) -> None:
+        _require_fcntl()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock_timeout = lock_timeout
+        # Decoded entries per file, reused until the file is replaced
+        self._decoded: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+        self._local_locks: Dict[str, asyncio.Lock] = {}
+
+    def _path(self, mountain_id: str, band: str) -> Path:
+        return self.directory / f"{quote(mountain_id, safe='')}.{quote(band, safe='')}.fc"
+
+    def put(
+        self,
+        mountain_id: str,
+        band: str,
+        payload: List[Dict[str, Any]],
+        summary: Dict[str, Any],
+        horizon_hours: int,
+        fetched_at: float,
+        ttl_seconds: float,
+    ) -> None:
+        """Store an entry; ``fetched_at`` is epoch seconds."""
+        body = dumps({"payload": payload, "summary": summary})
+        header = _HEADER.pack(_MAGIC, _VERSION, fetched_at, fetched_at + ttl_seconds, horizon_hours, len(body))
+        path = self._path(mountain_id, band)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(body)
+        # Readers see either the old file or the new one, never a mix
+        os.replace(tmp, path)
+
+    def get(self, mountain_id: str, band: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the unexpired entry, or None.
+
+        Entries are ``{"payload", "summary", "horizon_hours", "fetched_at",
+        "expires_at"}``.
+        """
+        path = self._path(mountain_id, band)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            memo = self._decoded.get(path)
+            if memo is not None and memo[0] == stamp:
+                entry = memo[1]
+            else:
+                entry = self._decode(f.fileno(), st.st_size)
+                if entry is None:
+                    return None
+                self._decoded[path] = (stamp, entry)
+        if entry["expires_at"] <= time.time():
+            return None
+        return entry
+
+    @staticmethod
+    def _decode(fd: int, size: int) -> Optional[Dict[str, Any]]:
+        if size < _HEADER.size:
+            return None
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, fetched_at, expires_at, horizon_hours, length = _HEADER.unpack_from(mm)
+            if magic != _MAGIC or version != _VERSION or _HEADER.size + length > size:
+                return None
+            entry = loads(mm[_HEADER.size:_HEADER.size + length])
+        entry.update(horizon_hours=horizon_hours, fetched_at=fetched_at, expires_at=expires_at)
+        return entry
+
+    def clear(self) -> None:
+        """Remove every entry (lock and slot files are kept)."""
+        for path in self.directory.glob("*.fc"):
+            path.unlink(missing_ok=True)
+        self._decoded.clear()
+
+    @asynccontextmanager
+    async def refresh_lock(self, mountain_id: str) -> AsyncIterator[bool]:
+        """
+        Hold the mountain's refresh lock across all workers.
+
+        Yields False if ``lock_timeout`` expired; the caller then refreshes
+        without the lock rather than failing the request.
+        """
+        # Coroutines of this process queue on an asyncio lock so only one
+        # of them polls the file lock
+        local = self._local_locks.setdefault(mountain_id, asyncio.Lock())
+        async with local:
+            fd = os.open(self.directory / f"{quote(mountain_id, safe='')}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                locked = await _flock(fd, self.lock_timeout)
+                try:
+                    yield locked
+                finally:
+                    if locked:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+
+class SharedSemaphore:
+    """
+    Host-wide counting semaphore over ``value`` flock'd slot files.
+
+    Drop-in for the ``acquire()``/``release()`` use of ``asyncio.Semaphore``.
+    """
+
+    def __init__(self, directory: str, value: int, name: str = "upstream") -> None:
+        _require_fcntl()
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        self._paths = [path / f"{name}-slot-{i}.lock" for i in range(value)]
+        self._held: List[int] = []
+
+    async def acquire(self) -> bool:
+        while True:
+            # Random start spreads workers over the slots
+            start = random.randrange(len(self._paths))
+            for i in range(len(self._paths)):
+                path = self._paths[(start + i) % len(self._paths)]
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    continue
+                self._held.append(fd)
+                return True
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+
+    def release(self) -> None:
+        fd = self._held.pop()
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -7,23 +7,42 @@ lapse rate.
 """
 import httpx
 import asyncio
-from typing import Optional, Dict, List, Any
+import math
+from time import perf_counter
+from typing import Optional, Dict, List, Any, Tuple
 from .config import settings
+from . import metrics, profiling
+from .shared_cache import SharedSemaphore, default_directory
 
 # Standard atmospheric lapse rate: 6.5°C per 1000m elevation gain
 LAPSE_RATE_K_PER_M: float = 0.0065
 
-# Semaphore to limit concurrent API requests (prevents rate limiting)
-_SEM: asyncio.Semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_WEATHER_REQUESTS)
+# Open-Meteo serves at most 16 days of hourly forecast
+MAX_HORIZON_HOURS: int = 16 * 24
 
+RESOLUTIONS = ("hourly", "3-hourly", "daily")
 
-async def fetch_hourly(lat: float, lon: float) -> Dict[str, Any]:
+# Points closer than this share one upstream fetch (Open-Meteo's finest
+# models have 1-2 km grid cells)
+CELL_GROUP_KM: float = 2.0
+EARTH_RADIUS_KM: float = 6371.0
+
+# Semaphore to limit concurrent API requests (prevents rate limiting).
+# With the shared cache the limit applies to all workers on the host.
+if settings.SHARED_CACHE_ENABLED:
+    _SEM = SharedSemaphore(settings.SHARED_CACHE_DIR or default_directory(), settings.MAX_CONCURRENT_WEATHER_REQUESTS)
+else:
+    _SEM = asyncio.Semaphore(settings.MAX_CONCURRENT_WEATHER_REQUESTS)
+
+
+async def fetch_hourly(lat: float, lon: float, forecast_hours: int = 24) -> Dict[str, Any]:
     """
-    Fetch 24-hour weather forecast from Open-Meteo API.
+    Fetch hourly weather forecast from Open-Meteo API.
     
     Args:
         lat: Latitude in decimal degrees
         lon: Longitude in decimal degrees
+        forecast_hours: Number of hours to fetch (1-384)
         
     Returns:
         Dict containing hourly weather data from Open-Meteo API
@@ -38,13 +57,31 @@ async def fetch_hourly(lat: float, lon: float) -> Dict[str, Any]:
         "hourly": "temperature_2m,precipitation,wind_speed_10m,wind_gusts_10m,wind_direction_10m,weather_code,relative_humidity_2m,cloud_cover",
         "timezone": "Europe/Madrid",
         "past_hours": 0,
-        "forecast_hours": 24,
+        "forecast_hours": forecast_hours,
     }
-    async with _SEM:
-        async with httpx.AsyncClient(timeout=settings.WEATHER_API_TIMEOUT) as client:
-            r = await client.get(settings.WEATHER_API_URL, params=params)
-            r.raise_for_status()
-            return r.json()
+    metrics.WEATHER_SEM_WAITING.inc()
+    wait_start = perf_counter()
+    try:
+        await _SEM.acquire()
+    finally:
+        metrics.WEATHER_SEM_WAITING.dec()
+    metrics.WEATHER_SEM_WAIT.observe(perf_counter() - wait_start)
+    try:
+        fetch_start = perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=settings.WEATHER_API_TIMEOUT) as client:
+                r = await client.get(settings.WEATHER_API_URL, params=params)
+                r.raise_for_status()
+                return r.json()
+        except Exception as e:
+            metrics.UPSTREAM_FETCH_ERRORS.labels(type(e).__name__).inc()
+            raise
+        finally:
+            elapsed = perf_counter() - fetch_start
+            metrics.UPSTREAM_FETCH_DURATION.observe(elapsed)
+            profiling.record_upstream(elapsed)
+    finally:
+        _SEM.release()
 
 
 def adjust_temperature_to_elevation(
@@ -142,6 +179,26 @@ def slice_next_24h(payload: Dict[str, Any], elev_target_m: float) -> List[Dict[s
     Returns:
         List of dicts, each containing processed hourly forecast data
     """
+    return slice_hours(payload, elev_target_m, 24)
+
+
+def slice_hours(payload: Dict[str, Any], elev_target_m: float, hours: int) -> List[Dict[str, Any]]:
+    """
+    Extract and process the next ``hours`` hours of weather data.
+    
+    Temperatures are corrected from the model grid elevation reported by
+    Open-Meteo (``elevation``) to ``elev_target_m``, so a single payload
+    can be processed for every band of a peak.
+    
+    Args:
+        payload: Raw API response from Open-Meteo
+        elev_target_m: Target elevation for temperature adjustment
+        hours: Maximum number of hourly rows to return
+        
+    Returns:
+        List of dicts, each containing processed hourly forecast data
+    """
+    elev_model_m: Optional[float] = payload.get("elevation")
     hourly: Dict[str, List] = payload.get("hourly", {})
     times: List[str] = hourly.get("time", [])
     temps: List[float] = hourly.get("temperature_2m", [])
@@ -164,11 +221,11 @@ def slice_next_24h(payload: Dict[str, Any], elev_target_m: float) -> List[Dict[s
     if not clouds:
         clouds = [None] * len(times)
 
-    n: int = min(len(times), len(temps), len(wind), len(precip), 24)
+    n: int = min(len(times), len(temps), len(wind), len(precip), hours)
     out: List[Dict[str, Any]] = []
     
     for i in range(n):
-        t_adj: float = adjust_temperature_to_elevation(temps[i], elev_target_m, elev_model_m=None)
+        t_adj: float = adjust_temperature_to_elevation(temps[i], elev_target_m, elev_model_m=elev_model_m)
         out.append({
             "time": times[i],
             "temp_c": t_adj,
@@ -183,4 +240,136 @@ def slice_next_24h(payload: Dict[str, Any], elev_target_m: float) -> List[Dict[s
             "humidity": humidity[i],
             "cloud_cover": clouds[i]
         })
-    return out
\ No newline at end of file
+    return out
+
+def cell_point(points: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """
+    Centroid of a group of nearby points, used as their shared fetch location.
+    
+    Args:
+        points: Dicts with ``lat`` and ``lon`` keys
+        
+    Returns:
+        (lat, lon) of the centroid, rounded to 3 decimals (~100 m)
+    """
+    lat = sum(p["lat"] for p in points) / len(points)
+    lon = sum(p["lon"] for p in points) / len(points)
+    return round(lat, 3), round(lon, 3)
+
+
+def distance_km(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """Great-circle distance between two ``lat``/``lon`` points in km."""
+    lat_a, lat_b = math.radians(a["lat"]), math.radians(b["lat"])
+    h = (
+        math.sin((lat_b - lat_a) / 2) ** 2
+        + math.cos(lat_a) * math.cos(lat_b) * math.sin(math.radians(b["lon"] - a["lon"]) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def cell_groups(
+    points: Dict[str, Dict[str, Any]], max_km: float = CELL_GROUP_KM
+) -> List[Tuple[Tuple[float, float], List[str]]]:
+    """
+    Group named points that can share one upstream fetch.
+    
+    A point joins the first group whose members are all within ``max_km``
+    of it, so no group is wider than ``max_km`` and its centroid stays in
+    about the same model grid cell as each member. Band points of a peak
+    are often 3-10 km apart, in which case each gets its own fetch.
+    
+    Args:
+        points: ``{name: {"lat", "lon", ...}}``
+        max_km: Largest distance between two points of one group
+        
+    Returns:
+        ``(cell_point of the group, names)`` per group, in input order
+    """
+    groups: List[List[str]] = []
+    for name, point in points.items():
+        for group in groups:
+            if all(distance_km(point, points[other]) <= max_km for other in group):
+                group.append(name)
+                break
+        else:
+            groups.append([name])
+    return [(cell_point([points[name] for name in group]), group) for group in groups]
+
+
+def _max_or_none(values: List[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return max(present) if present else None
+
+
+def _stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    temps = [r["temp_c"] for r in rows]
+    return {
+        "hours": len(rows),
+        "temp_min_c": min(temps) if temps else None,
+        "temp_max_c": max(temps) if temps else None,
+        "wind_gust_max_kmh": _max_or_none([r["wind_gust_kmh"] for r in rows]),
+        "precip_total_mm": round(sum(r["precip_mm"] or 0 for r in rows), 1),
+        "snow_hours": sum(1 for r in rows if r["snow_likely"]),
+    }
+
+
+def summarize_forecast(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize processed hourly rows for one band.
+    
+    Args:
+        rows: Hourly rows as returned by slice_hours
+        
+    Returns:
+        Dict with ``next_24h`` and ``horizon`` (all cached hours) stats:
+        min/max temperature, max gust, total precipitation and snow hours
+    """
+    return {"next_24h": _stats(rows[:24]), "horizon": _stats(rows)}
+
+
+def aggregate_forecast(rows: List[Dict[str, Any]], resolution: str) -> List[Dict[str, Any]]:
+    """
+    Aggregate processed hourly rows to a coarser resolution.
+    
+    ``3-hourly`` groups consecutive 3-hour blocks from the first row;
+    ``daily`` groups by local calendar date (rows carry Europe/Madrid
+    times). Each bucket is computed in one pass over its slice of rows.
+    
+    Args:
+        rows: Hourly rows as returned by slice_hours
+        resolution: One of RESOLUTIONS
+        
+    Returns:
+        Hourly rows unchanged for ``hourly``; otherwise one dict per bucket
+        with min/max temperature, max wind and gust, summed precipitation
+        and number of snow-likely hours
+    """
+    if resolution == "hourly":
+        return rows
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {RESOLUTIONS}")
+
+    if resolution == "daily":
+        bounds = [i for i in range(1, len(rows)) if rows[i]["time"][:10] != rows[i - 1]["time"][:10]]
+    else:
+        bounds = list(range(3, len(rows), 3))
+    starts = [0] + bounds
+    ends = bounds + [len(rows)]
+
+    out: List[Dict[str, Any]] = []
+    for a, b in zip(starts, ends):
+        chunk = rows[a:b]
+        if not chunk:
+            continue
+        temps = [r["temp_c"] for r in chunk]
+        out.append({
+            "time": chunk[0]["time"],
+            "hours": len(chunk),
+            "temp_min_c": min(temps),
+            "temp_max_c": max(temps),
+            "wind_speed_max_kmh": _max_or_none([r["wind_speed_kmh"] for r in chunk]),
+            "wind_gust_max_kmh": _max_or_none([r["wind_gust_kmh"] for r in chunk]),
+            "precip_sum_mm": round(sum(r["precip_mm"] or 0 for r in chunk), 1),
+            "snow_hours": sum(1 for r in chunk if r["snow_likely"]),
+        })
+    return out
@@ -0,0 +1,33 @@
+"""
+Shared benchmark setup.
+
+Importing this module points the app at a throwaway SQLite database, so
+it must be imported before anything from ``app``.
+"""
+import os
+import tempfile
+import timeit
+from statistics import mean, median
+from typing import Callable, Dict, List
+
+_DB_DIR = tempfile.mkdtemp(prefix="pyrenees-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_DIR}/bench.db")
+
+
+def per_call_us(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best-of-``repeat`` time per call of ``fn`` in microseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e6
+
+
+def summarize_ms(samples_s: List[float]) -> Dict[str, float]:
+    """Latency summary of samples given in seconds."""
+    ordered = sorted(samples_s)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "p50_ms": median(ordered) * 1e3,
+        "p95_ms": p95 * 1e3,
+        "mean_ms": mean(ordered) * 1e3,
+    }
@@ -0,0 +1,131 @@
+"""
+Benchmark the overhead of metrics instrumentation on the cache-hit path.
+
+Measures the per-call cost of counter/histogram updates and of the
+MetricsMiddleware wrapper, and compares it with the end-to-end latency
+of a cache-hit ``GET /api/weather/{mountain_id}``.
+
+Run: python -m benchmarks.bench_metrics
+"""
+import asyncio
+import json
+import timeit
+from datetime import datetime, timezone
+from statistics import median
+from time import perf_counter
+
+from . import _harness  # noqa: F401  (must precede app imports)
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import metrics  # noqa: E402
+from app.db import Base, async_session, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import WeatherCache  # noqa: E402
+
+CACHE_HIT_REQUESTS = 500
+MIDDLEWARE_CALLS = 20000
+
+
+def _per_call_ns(stmt, setup: str = "pass", number: int = 200000) -> float:
+    best = min(timeit.repeat(stmt, setup=setup, number=number, repeat=5))
+    return best / number * 1e9
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _noop_send(message):
+    pass
+
+
+async def _noop_receive():
+    return {"type": "http.request"}
+
+
+async def _asgi_call_ns(asgi_app) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+    start = perf_counter()
+    for _ in range(MIDDLEWARE_CALLS):
+        await asgi_app(dict(scope), _noop_receive, _noop_send)
+    return (perf_counter() - start) / MIDDLEWARE_CALLS * 1e9
+
+
+async def _seed_cache() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    hourly = [
+        {"time": f"2025-01-01T{h:02d}:00", "temp_c": 1.0, "precip_mm": 0.0}
+        for h in range(24)
+    ]
+    async with async_session() as session:
+        await session.execute(
+            insert(WeatherCache).values(
+                mountain_id="aneto",
+                band="base",
+                payload=hourly,
+                ttl_seconds=10**9,
+                fetched_at=datetime.now(timezone.utc),
+            )
+        )
+        await session.commit()
+
+
+async def _cache_hit_latencies_us() -> list[float]:
+    await _seed_cache()
+    transport = httpx.ASGITransport(app=app)
+    samples: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(20):
+            await client.get("/api/weather/aneto?band=base")
+        for _ in range(CACHE_HIT_REQUESTS):
+            start = perf_counter()
+            r = await client.get("/api/weather/aneto?band=base")
+            samples.append((perf_counter() - start) * 1e6)
+            r.raise_for_status()
+    return samples
+
+
+async def _run_async() -> dict:
+    bare_ns = await _asgi_call_ns(_noop_app)
+    wrapped_ns = await _asgi_call_ns(metrics.MetricsMiddleware(_noop_app))
+    latencies = await _cache_hit_latencies_us()
+    await engine.dispose()
+    return {
+        "middleware_overhead_ns": wrapped_ns - bare_ns,
+        "cache_hit_p50_us": median(latencies),
+        "cache_hit_mean_us": sum(latencies) / len(latencies),
+    }
+
+
+def run() -> dict:
+    """Run all measurements and return them as a flat dict."""
+    registry = metrics.Registry()
+    counter = metrics.Counter("bench_total", "Bench.", ("result",), registry=registry)
+    histogram = metrics.Histogram("bench_seconds", "Bench.", ("route",), registry=registry)
+    results = {
+        "counter_inc_ns": _per_call_ns(lambda: counter.labels("hit").inc()),
+        "histogram_observe_ns": _per_call_ns(lambda: histogram.labels("/x").observe(0.0123)),
+    }
+    results.update(asyncio.run(_run_async()))
+    # One request records one histogram sample, one counter per route and
+    # one cache-result counter on top of the middleware wrapper.
+    per_request_ns = (
+        results["middleware_overhead_ns"]
+        + results["histogram_observe_ns"]
+        + 2 * results["counter_inc_ns"]
+    )
+    results["overhead_pct_of_cache_hit"] = per_request_ns / (results["cache_hit_p50_us"] * 1e3) * 100
+    return results
+
+
+def main() -> None:
+    print(json.dumps({"benchmark": "metrics", "results": run()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark JSON encoding and response compression for the largest payloads.
+
+Compares FastAPI's default path (``jsonable_encoder`` + ``json.dumps``)
+with ``FastJSONResponse`` (orjson) and its stdlib fallback, and reports
+bytes on the wire raw, gzipped and brotli-compressed at the configured
+levels.
+
+Run: python -m benchmarks.bench_serialization
+"""
+import gzip
+import json
+from typing import Any, Dict
+
+from . import _harness  # noqa: F401  (must precede app imports)
+from ._harness import per_call_us
+from .stub_openmeteo import build_payload
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app import main, responses  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.weather import MAX_HORIZON_HOURS, aggregate_forecast, slice_hours  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        return responses.dumps(content)
+    finally:
+        responses.orjson = orjson
+
+
+def _measure(content: Any) -> Dict[str, float]:
+    body = responses.dumps(content)
+    result = {
+        "default_us": per_call_us(lambda: JSONResponse(jsonable_encoder(content)).body),
+        "fast_us": per_call_us(lambda: responses.FastJSONResponse(content).body),
+        "stdlib_fallback_us": per_call_us(lambda: _stdlib_dumps(content)),
+        "raw_bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, settings.COMPRESSION_LEVEL)),
+        "gzip_us": per_call_us(lambda: gzip.compress(body, settings.COMPRESSION_LEVEL)),
+    }
+    if brotli is not None:
+        result["brotli_bytes"] = len(brotli.compress(body, quality=settings.BROTLI_QUALITY))
+        result["brotli_us"] = per_call_us(lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY))
+    return result
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    """Return ``{benchmark name: {metric: value}}``."""
+    peaks_all = json.loads(main.list_peaks_all().body)
+    rows_24 = slice_hours(build_payload(42.63, 0.65, 24), 3000, 24)
+    rows_16d = slice_hours(build_payload(42.63, 0.65, MAX_HORIZON_HOURS), 3000, MAX_HORIZON_HOURS)
+
+    return {
+        "serialization.peaks_all": _measure(peaks_all),
+        "serialization.weather_24h": _measure(aggregate_forecast(rows_24, "hourly")),
+        "serialization.weather_16d": _measure(aggregate_forecast(rows_16d, "hourly")),
+        "serialization.weather_16d_daily": _measure(aggregate_forecast(rows_16d, "daily")),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
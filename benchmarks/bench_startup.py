@@ -0,0 +1,90 @@
+"""
+Benchmark application startup: import-to-ready time and its phases.
+
+Each run starts a fresh interpreter that imports ``app.main`` and runs the
+lifespan startup, against a new database (cold: schema is created) and
+against an existing one (warm: the schema version marker matches and
+``create_all`` is skipped). Also compares loading the catalog from the
+precompiled snapshot with compiling it from JSON.
+
+Run: python -m benchmarks.bench_startup
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+from typing import Dict, List
+
+from . import _harness  # noqa: F401  (must precede app imports)
+from ._harness import per_call_us
+
+from app.catalog_snapshot import CATALOG_PATH, build_snapshot, load_catalog  # noqa: E402
+
+RUNS = 5
+
+_CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+from app import main
+
+async def ready():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+
+imported = time.perf_counter()
+asyncio.run(ready())
+print(json.dumps({
+    "import_s": imported - started,
+    "ready_s": time.perf_counter() - started,
+    "phases": main.STARTUP_TIMINGS,
+}))
+"""
+
+
+def _start_once(db_path: Path) -> Dict[str, float]:
+    env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{db_path}")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _median_ms(samples: List[Dict[str, float]], key: str) -> float:
+    return median(s[key] for s in samples) * 1e3
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    """Return ``{benchmark name: {metric: value}}``."""
+    tmp = Path(tempfile.mkdtemp(prefix="pyrenees-bench-startup-"))
+    cold = [_start_once(tmp / f"cold-{i}.db") for i in range(RUNS)]
+    warm_db = tmp / "warm.db"
+    _start_once(warm_db)
+    warm = [_start_once(warm_db) for _ in range(RUNS)]
+
+    snapshot = tmp / "catalog.pickle"
+    build_snapshot(CATALOG_PATH, snapshot)
+    missing = tmp / "missing.pickle"
+
+    return {
+        "startup.import_to_ready": {
+            "cold_db_ms": _median_ms(cold, "ready_s"),
+            "warm_db_ms": _median_ms(warm, "ready_s"),
+            "import_ms": _median_ms(warm, "import_s"),
+            "catalog_ms": median(s["phases"]["catalog"] for s in warm) * 1e3,
+            "schema_cold_ms": median(s["phases"]["schema"] for s in cold) * 1e3,
+            "schema_warm_ms": median(s["phases"]["schema"] for s in warm) * 1e3,
+        },
+        "startup.catalog": {
+            "snapshot_us": per_call_us(lambda: load_catalog(CATALOG_PATH, snapshot)),
+            "json_us": per_call_us(lambda: load_catalog(CATALOG_PATH, missing)),
+        },
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
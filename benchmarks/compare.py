@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Run: python -m benchmarks.compare baseline.json current.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+# Metric name suffixes where a smaller value is better / a larger one is better.
+# Anything else (counts of peaks, requests, ...) is informational only.
+LOWER_IS_BETTER = ("_ns", "_us", "_ms", "_s", "_pct", "upstream_calls", "errors", "_bytes")
+HIGHER_IS_BETTER = ("_rps",)
+
+
+def direction(metric: str) -> Optional[int]:
+    """Return -1 if lower is better, +1 if higher is better, None if not compared."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float = 0.15,
+) -> List[Dict[str, Any]]:
+    """
+    Compare the ``results`` sections of two runs.
+
+    Returns one row per shared metric with the relative change and a
+    ``regression`` flag set when it moved the wrong way by more than
+    ``threshold`` (a fraction, 0.15 = 15%).
+    """
+    rows: List[Dict[str, Any]] = []
+    for bench, metrics in current.items():
+        for metric, new in metrics.items():
+            old = baseline.get(bench, {}).get(metric)
+            sign = direction(metric)
+            if sign is None or not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            if old == 0:
+                change = 0.0 if new == 0 else float("inf")
+            else:
+                change = (new - old) / abs(old)
+            rows.append({
+                "benchmark": bench,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": change * sign < -threshold,
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['benchmark']:<28} {row['metric']:<24} "
+            f"{row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+            f"{row['change'] * 100:+7.1f}% {flag}"
+        )
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
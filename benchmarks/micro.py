@@ -0,0 +1,97 @@
+"""
+Micro-benchmarks for forecast processing and catalog lookups.
+
+Run: python -m benchmarks.micro
+"""
+import json
+import tempfile
+import time
+from typing import Dict
+
+import numpy as np
+
+from . import _harness  # noqa: F401  (must precede app imports)
+from ._harness import per_call_us
+from .stub_openmeteo import build_payload
+
+from app import main  # noqa: E402
+from app.catalog_snapshot import get_catalog  # noqa: E402
+from app.ranking import hourly_scores, rank_windows  # noqa: E402
+from app.archive import ForecastArchive, iter_csv, iter_ndjson  # noqa: E402
+from app.shared_cache import SharedForecastCache  # noqa: E402
+from app.weather import MAX_HORIZON_HOURS, aggregate_forecast, slice_hours, slice_next_24h  # noqa: E402
+
+# Peaks x 3 bands ranked by the best-windows benchmark
+RANKED_PEAKS = 300
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    """Return ``{benchmark name: {metric: value}}``."""
+    payload_24 = build_payload(42.63, 0.65, 24)
+    payload_7d = build_payload(42.63, 0.65, 168)
+    payload_16d = build_payload(42.63, 0.65, MAX_HORIZON_HOURS)
+    rows_16d = slice_hours(payload_16d, 3000, MAX_HORIZON_HOURS)
+    scores_16d = hourly_scores(rows_16d)
+    series = [
+        (np.asarray(scores_16d[i % 24:] + scores_16d[:i % 24]), i % 5) for i in range(RANKED_PEAKS * 3)
+    ]
+    shared = SharedForecastCache(tempfile.mkdtemp(prefix="pyrenees-bench-shared-"))
+    shared.put("aneto", "base", rows_16d, {}, MAX_HORIZON_HOURS, time.time(), 3600)
+    rows_24 = slice_hours(payload_24, 3000, 24)
+    archive_batch = [
+        {"fetched_at": "2026-01-01T00:00:00+00:00", "mountain_id": f"peak-{i % 10}", "band": "base",
+         "horizon_hours": 24, "rows": rows_24}
+        for i in range(100)
+    ]
+    # Exports read a fixed archive; writes go to a separate one that grows
+    archive = ForecastArchive(tempfile.mkdtemp(prefix="pyrenees-bench-archive-"))
+    archive.write_batch(archive_batch)
+    write_archive = ForecastArchive(tempfile.mkdtemp(prefix="pyrenees-bench-archive-"))
+    area = get_catalog().areas[0]
+    massif = area["massifs"][0]
+
+    return {
+        "micro.slice_next_24h": {
+            "24h_payload_us": per_call_us(lambda: slice_next_24h(payload_24, 3000)),
+            "7d_payload_us": per_call_us(lambda: slice_next_24h(payload_7d, 3000)),
+        },
+        "micro.slice_hours": {
+            "16d_us": per_call_us(lambda: slice_hours(payload_16d, 3000, MAX_HORIZON_HOURS)),
+        },
+        "micro.aggregate_forecast": {
+            "16d_daily_us": per_call_us(lambda: aggregate_forecast(rows_16d, "daily")),
+            "16d_3hourly_us": per_call_us(lambda: aggregate_forecast(rows_16d, "3-hourly")),
+        },
+        "micro.ranking": {
+            "hourly_scores_16d_us": per_call_us(lambda: hourly_scores(rows_16d)),
+            "rank_300_peaks_16d_us": per_call_us(lambda: rank_windows(series, k=10, window_hours=3)),
+        },
+        "micro.shared_cache": {
+            "put_16d_us": per_call_us(
+                lambda: shared.put("aneto", "mid", rows_16d, {}, MAX_HORIZON_HOURS, time.time(), 3600)
+            ),
+            "get_hit_us": per_call_us(lambda: shared.get("aneto", "base")),
+            "get_decode_16d_us": per_call_us(lambda: (shared._decoded.clear(), shared.get("aneto", "base"))),
+        },
+        "micro.archive": {
+            "write_batch_100x24h_us": per_call_us(lambda: write_archive.write_batch(archive_batch), repeat=3),
+            "export_ndjson_100_us": per_call_us(lambda: sum(1 for _ in iter_ndjson(archive.iter_records()))),
+            "export_csv_100_us": per_call_us(lambda: sum(1 for _ in iter_csv(archive.iter_records()))),
+            "export_filtered_10_us": per_call_us(
+                lambda: sum(1 for _ in iter_ndjson(archive.iter_records(mountain_id="peak-0")))
+            ),
+        },
+        "micro.catalog": {
+            "list_areas_us": per_call_us(main.list_areas),
+            "list_massifs_us": per_call_us(lambda: main.list_massifs(area["id"])),
+            "list_peaks_us": per_call_us(lambda: main.list_peaks(area["id"], massif["id"])),
+            "list_peaks_query_us": per_call_us(lambda: main.list_peaks(area["id"], massif["id"], q="pic")),
+            "peaks_all_us": per_call_us(main.list_peaks_all),
+            "peaks_all_query_us": per_call_us(lambda: main.list_peaks_all(q="aneto")),
+            "peak_details_us": per_call_us(lambda: main.peak_details("aneto")),
+        },
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
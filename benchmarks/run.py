@@ -0,0 +1,90 @@
+"""
+Run the benchmark suite and write JSON results comparable across commits.
+
+Run:
+    python -m benchmarks.run --output bench-results.json
+    python -m benchmarks.run --output new.json --compare bench-results.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from . import _harness  # noqa: F401  (must precede app imports)
+from . import bench_metrics, bench_serialization, bench_startup, compare, micro, scenarios
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Pyrenees benchmark suite.")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--only", choices=["micro", "scenarios", "metrics", "serialization", "startup"], action="append",
+                        help="Run only these groups (repeatable)")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--peaks", type=int, default=12, help="Saved peaks in dashboard scenarios")
+    args = parser.parse_args(argv)
+
+    groups: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "micro": micro.run,
+        "scenarios": lambda: scenarios.run(args.stub_latency_ms, args.stub_error_rate, args.peaks),
+        "metrics": lambda: {"metrics.instrumentation": bench_metrics.run()},
+        "serialization": bench_serialization.run,
+        "startup": bench_startup.run,
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn in groups.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"running {name}...", file=sys.stderr)
+        results.update(fn())
+
+    report = {
+        "meta": {
+            "git_commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stub": {"latency_ms": args.stub_latency_ms, "error_rate": args.stub_error_rate},
+            "peaks": args.peaks,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        rows = compare.compare(baseline, results, args.threshold)
+        regressions = [r for r in rows if r["regression"]]
+        for r in regressions:
+            print(
+                f"REGRESSION {r['benchmark']}.{r['metric']}: "
+                f"{r['baseline']:.3f} -> {r['current']:.3f} ({r['change'] * 100:+.1f}%)",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+End-to-end load scenarios against the app with a local Open-Meteo stub.
+
+The app runs in-process behind ``httpx.ASGITransport`` with a throwaway
+SQLite database; upstream calls go to ``stub_openmeteo`` over loopback.
+
+Scenarios:
+    cold_dashboard  - empty cache, load N saved peaks like the frontend does
+    hot_cache       - repeated weather requests served from the cache
+    cache_stampede  - many concurrent requests for one uncached peak/band
+    catalog_search  - global peak search with a mix of queries
+    warm_dashboard  - reload cached cards: per-band requests vs one batch
+                      request vs ETag revalidation (what the service worker sends)
+
+Run: python -m benchmarks.scenarios
+"""
+import asyncio
+import json
+from time import perf_counter
+from typing import Any, Dict, List
+
+from . import _harness  # noqa: F401  (must precede app imports)
+from ._harness import summarize_ms
+from .stub_openmeteo import StubConfig, StubServer
+
+import httpx  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import Base, async_session, engine  # noqa: E402
+from app.catalog_snapshot import get_catalog  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import WeatherCache  # noqa: E402
+
+SEARCH_QUERIES = ["aneto", "pic", "maladeta", "perdido", "zz-no-match", ""]
+
+
+async def _reset_cache() -> None:
+    async with async_session() as session:
+        await session.execute(delete(WeatherCache))
+        await session.commit()
+
+
+async def _timed_get(client: httpx.AsyncClient, url: str) -> tuple[float, int]:
+    start = perf_counter()
+    r = await client.get(url)
+    return perf_counter() - start, r.status_code
+
+
+async def cold_dashboard(client: httpx.AsyncClient, stub: StubConfig, peaks: List[str]) -> Dict[str, Any]:
+    await _reset_cache()
+    stub.reset_counters()
+
+    async def load_card(peak_id: str) -> tuple[float, int]:
+        await client.get(f"/api/catalog/peaks/{peak_id}")
+        return await _timed_get(client, f"/api/weather/{peak_id}?band=base")
+
+    start = perf_counter()
+    await client.get("/api/my/mountains")
+    results = await asyncio.gather(*(load_card(p) for p in peaks))
+    wall = perf_counter() - start
+    return {
+        "peaks": len(peaks),
+        "wall_ms": wall * 1e3,
+        **summarize_ms([t for t, _ in results]),
+        "upstream_calls": stub.requests,
+        "errors": sum(1 for _, status in results if status != 200),
+    }
+
+
+async def hot_cache(client: httpx.AsyncClient, stub: StubConfig, peaks: List[str], rounds: int = 20) -> Dict[str, Any]:
+    for p in peaks:
+        await client.get(f"/api/weather/{p}?band=base")
+    stub.reset_counters()
+
+    samples: List[float] = []
+    errors = 0
+    start = perf_counter()
+    for _ in range(rounds):
+        for p in peaks:
+            elapsed, status = await _timed_get(client, f"/api/weather/{p}?band=base")
+            samples.append(elapsed)
+            errors += status != 200
+    wall = perf_counter() - start
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / wall,
+        **summarize_ms(samples),
+        "upstream_calls": stub.requests,
+        "errors": errors,
+    }
+
+
+async def cache_stampede(client: httpx.AsyncClient, stub: StubConfig, concurrency: int = 50) -> Dict[str, Any]:
+    await _reset_cache()
+    stub.reset_counters()
+
+    start = perf_counter()
+    results = await asyncio.gather(
+        *(_timed_get(client, "/api/weather/aneto?band=summit") for _ in range(concurrency))
+    )
+    wall = perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "wall_ms": wall * 1e3,
+        **summarize_ms([t for t, _ in results]),
+        "upstream_calls": stub.requests,
+        "errors": sum(1 for _, status in results if status != 200),
+    }
+
+
+async def catalog_search(client: httpx.AsyncClient, rounds: int = 30) -> Dict[str, Any]:
+    samples: List[float] = []
+    start = perf_counter()
+    for _ in range(rounds):
+        for q in SEARCH_QUERIES:
+            elapsed, _ = await _timed_get(client, f"/api/catalog/peaks_all?q={q}")
+            samples.append(elapsed)
+    wall = perf_counter() - start
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / wall,
+        **summarize_ms(samples),
+    }
+
+
+async def warm_dashboard(client: httpx.AsyncClient, peaks: List[str]) -> Dict[str, Any]:
+    etags = {p: (await client.get(f"/api/weather/{p}/bands")).headers["etag"] for p in peaks}
+
+    async def timed(urls_headers: List[tuple[str, Dict[str, str]]]) -> tuple[float, int, int]:
+        start = perf_counter()
+        responses = await asyncio.gather(*(client.get(u, headers=h) for u, h in urls_headers))
+        return perf_counter() - start, len(responses), sum(len(r.content) for r in responses)
+
+    per_band = await timed(
+        [(f"/api/weather/{p}?band={b}", {}) for p in peaks for b in ("base", "mid", "summit")]
+        + [(f"/api/weather/{p}/summary", {}) for p in peaks]
+    )
+    batch = await timed([(f"/api/weather/{p}/bands", {}) for p in peaks])
+    revalidate = await timed([(f"/api/weather/{p}/bands", {"If-None-Match": etags[p]}) for p in peaks])
+    return {
+        "peaks": len(peaks),
+        "per_band_wall_ms": per_band[0] * 1e3,
+        "per_band_requests": per_band[1],
+        "per_band_bytes": per_band[2],
+        "batch_wall_ms": batch[0] * 1e3,
+        "batch_requests": batch[1],
+        "batch_bytes": batch[2],
+        "revalidate_wall_ms": revalidate[0] * 1e3,
+        "revalidate_bytes": revalidate[2],
+    }
+
+
+async def _run_async(stub: StubConfig, n_peaks: int) -> Dict[str, Dict[str, Any]]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    peaks = sorted(get_catalog().peak_by_id)[:n_peaks]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return {
+                "scenario.cold_dashboard": await cold_dashboard(client, stub, peaks),
+                "scenario.hot_cache": await hot_cache(client, stub, peaks),
+                "scenario.cache_stampede": await cache_stampede(client, stub),
+                "scenario.warm_dashboard": await warm_dashboard(client, peaks),
+                "scenario.catalog_search": await catalog_search(client),
+            }
+    finally:
+        await engine.dispose()
+
+
+def run(latency_ms: float = 50.0, error_rate: float = 0.0, n_peaks: int = 12) -> Dict[str, Dict[str, Any]]:
+    """Run all scenarios against a fresh stub and return their results."""
+    stub = StubConfig(latency_ms=latency_ms, error_rate=error_rate)
+    with StubServer(stub) as server:
+        previous_url = settings.WEATHER_API_URL
+        settings.WEATHER_API_URL = server.url
+        try:
+            return asyncio.run(_run_async(stub, n_peaks))
+        finally:
+            settings.WEATHER_API_URL = previous_url
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,151 @@
+"""
+Local stub of the Open-Meteo forecast endpoint.
+
+Serves deterministic hourly payloads shaped like the real API with
+configurable latency and error injection, so benchmarks never depend on
+the network or on Open-Meteo rate limits.
+
+Run standalone:
+    python -m benchmarks.stub_openmeteo --port 8099 --latency-ms 80 --error-rate 0.05
+then start the app with WEATHER_API_URL=http://127.0.0.1:8099/v1/forecast
+"""
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DEFAULT_FORECAST_DAYS = 7
+
+
+class StubConfig:
+    """Mutable stub behaviour, shared with the running server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 42,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.errors = 0
+
+
+def build_payload(lat: float, lon: float, hours: int, start: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build an Open-Meteo-shaped hourly payload for the given point."""
+    start = start or datetime(2025, 1, 1)
+    phase = (lat * 7 + lon * 13) % 24
+    times: List[str] = []
+    temps: List[float] = []
+    precip: List[float] = []
+    wind: List[float] = []
+    for i in range(hours):
+        times.append((start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M"))
+        diurnal = math.sin((i + phase) / 24 * 2 * math.pi)
+        temps.append(round(2.0 + 6.0 * diurnal, 1))
+        precip.append(round(max(0.0, 1.5 * math.sin(i / 11 + phase)), 1))
+        wind.append(round(15 + 10 * abs(math.cos(i / 7 + phase)), 1))
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "elevation": round(1500 + (lat * 1000) % 1000),
+        "timezone": "Europe/Madrid",
+        "hourly": {
+            "time": times,
+            "temperature_2m": temps,
+            "precipitation": precip,
+            "wind_speed_10m": wind,
+            "wind_gusts_10m": [round(w * 1.6, 1) for w in wind],
+            "wind_direction_10m": [(i * 15) % 360 for i in range(hours)],
+            "weather_code": [61 if p > 0 else 2 for p in precip],
+            "relative_humidity_2m": [70] * hours,
+            "cloud_cover": [min(100, int(p * 60)) for p in precip],
+        },
+    }
+
+
+def create_app(config: StubConfig) -> Starlette:
+    """Create the stub ASGI app bound to ``config``."""
+
+    async def forecast(request: Request) -> JSONResponse:
+        config.requests += 1
+        delay = config.latency_ms + config.rng.uniform(0, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.rng.random() < config.error_rate:
+            config.errors += 1
+            return JSONResponse({"error": True, "reason": "injected"}, status_code=503)
+        params = request.query_params
+        if "forecast_hours" in params:
+            hours = int(params["forecast_hours"])
+        else:
+            hours = int(params.get("forecast_days", DEFAULT_FORECAST_DAYS)) * 24
+        return JSONResponse(
+            build_payload(float(params["latitude"]), float(params["longitude"]), hours)
+        )
+
+    return Starlette(routes=[Route("/v1/forecast", forecast)])
+
+
+class StubServer:
+    """Run the stub with uvicorn on a background thread."""
+
+    def __init__(self, config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(config), host=host, port=port, log_level="warning", lifespan="off")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1/forecast"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Open-Meteo stub failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -190,6 +190,10 @@ function createMountainCard(id, mountain) {
   
   let currentBand = 'base';
   let currentWeatherData = null;
+  // Per-band forecasts and server-side summaries, fetched once per card
+  const bandData = {};
+  let summaries = null;
+  let updatedAt = null;
   
   // Band switching
   function setActiveBand(band) {
@@ -209,13 +213,19 @@ function createMountainCard(id, mountain) {
     
     const first = weatherData[0];
     const snowIcon = first.snow_likely ? '(snow)' : '';
+    const day = summaries && summaries[currentBand] ? summaries[currentBand].next_24h : null;
     
     summaryEl.innerHTML = `
       <div class="current-weather">
          ${first.temp_c}°C •  ${first.wind_speed_kmh} km/h${first.wind_gust_kmh ? ` (gusts ${first.wind_gust_kmh})` : ''}
       </div>
+      ${day ? `
       <div class="weather-meta">
-         ${first.precip_mm} mm${snowIcon} • Updated ${new Date().toLocaleTimeString('en-GB', {hour: '2-digit', minute: '2-digit'})} • TZ: Europe/Madrid
+         24h: ${day.temp_min_c}° to ${day.temp_max_c}°C • Max gust ${day.wind_gust_max_kmh ?? '-'} km/h • ${day.precip_total_mm} mm${day.snow_hours ? ` • ${day.snow_hours}h snow` : ''}
+      </div>
+      ` : ''}
+      <div class="weather-meta">
+         ${first.precip_mm} mm${snowIcon} • Updated ${updatedAt.toLocaleTimeString('en-GB', {hour: '2-digit', minute: '2-digit'})} • TZ: Europe/Madrid
       </div>
     `;
     
@@ -257,21 +267,36 @@ function createMountainCard(id, mountain) {
     tableWrap.innerHTML = tableHTML;
   }
   
-  // Load weather for a band
+  // One request fetches every band and its summary; band switches then
+  // render from memory. The service worker serves repeat visits from its
+  // cache.
+  let allBands = null;
+  
   async function loadWeather(band) {
     try {
       setActiveBand(band);
-      summaryEl.innerHTML = '<div class="loading">Loading weather...</div>';
-      tableWrap.innerHTML = '';
       
-      const data = await api(`/api/weather/${id}?band=${band}`);
+      if (!allBands) {
+        summaryEl.innerHTML = '<div class="loading">Loading weather...</div>';
+        tableWrap.innerHTML = '';
+        allBands = api(`/api/weather/${id}/bands`).catch((err) => {
+          allBands = null;
+          throw err;
+        });
+      }
+      const all = await allBands;
+      Object.assign(bandData, all.bands);
+      summaries = all.summary;
+      updatedAt = new Date(all.fetched_at);
       
+      const data = bandData[band];
       if (!Array.isArray(data) || data.length === 0) {
         summaryEl.innerHTML = '<div class="error">No weather data available</div>';
         return;
       }
       
-      renderWeather(data);
+      // Ignore responses for a band the user has already switched away from
+      if (band === currentBand) renderWeather(data);
     } catch (err) {
       summaryEl.innerHTML = `
         <div class="error">
@@ -544,5 +569,39 @@ function createCharts(weatherData) {
   });
 }
 
+// ===================== BEST CLIMBING WINDOWS ======================
+const btnBestWindows = document.getElementById('bestWindowsBtn');
+const bestWindowsList = document.getElementById('bestWindows');
+
+btnBestWindows.onclick = async () => {
+  bestWindowsList.innerHTML = '<li class="loading">Ranking windows...</li>';
+  try {
+    const data = await api('/api/my/best-windows?k=10&window_hours=3');
+    
+    if (!data.windows.length) {
+      bestWindowsList.innerHTML = '<li class="muted" style="text-align:center; padding: 20px;">No forecasts cached yet. Open your mountains first.</li>';
+      return;
+    }
+    
+    bestWindowsList.innerHTML = '';
+    for (const w of data.windows) {
+      const li = document.createElement('li');
+      li.innerHTML = `
+        <div class="peak-info">
+          <div class="peak-name">${w.name} • ${w.band.charAt(0).toUpperCase() + w.band.slice(1)} (${w.elev_m} m)</div>
+          <div class="peak-details">${w.start.slice(0, 10)} ${w.start.slice(11, 16)}–${w.end.slice(11, 16)} • ${w.hours}h window</div>
+        </div>
+        <span class="badge">Score ${w.score}</span>
+      `;
+      bestWindowsList.appendChild(li);
+    }
+  } catch (err) {
+    bestWindowsList.innerHTML = `<li class="error">${err.message}</li>`;
+  }
+};
+
 // ===================== INITIALIZE ======================
+if ('serviceWorker' in navigator) {
+  navigator.serviceWorker.register('/sw.js').catch(() => {});
+}
 loadMy();
\ No newline at end of file
@@ -0,0 +1,119 @@
+// Service worker: offline support and fewer server round trips.
+//
+// - Static assets and catalog responses: cache-first. The catalog only
+//   changes on deploy; bump VERSION when public/ or the catalog changes.
+// - Forecasts: stale-while-revalidate. A cached forecast is served
+//   without touching the network until the server's max-age (the time left
+//   on its own forecast cache) runs out; after that the cached copy is
+//   still served straight away while it is revalidated with If-None-Match,
+//   so an unchanged forecast costs a 304 instead of a full body.
+// - Everything else (saved mountains, best windows, admin) goes to the
+//   network.
+
+const VERSION = 'v1';
+const STATIC_CACHE = `static-${VERSION}`;
+const CATALOG_CACHE = `catalog-${VERSION}`;
+const FORECAST_CACHE = 'forecasts-v1';
+const KEEP = [STATIC_CACHE, CATALOG_CACHE, FORECAST_CACHE];
+
+const PRECACHE = ['/', '/static/app.js', '/static/style.css'];
+
+// Header recording when a forecast was stored (or last revalidated)
+const STORED_AT = 'x-sw-stored-at';
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(STATIC_CACHE)
+      .then((cache) => cache.addAll(PRECACHE))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(names.filter((n) => !KEEP.includes(n)).map((n) => caches.delete(n))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+
+  if (url.origin !== self.location.origin) {
+    // Chart.js from the CDN: keep a copy for offline use
+    if (url.hostname === 'cdn.jsdelivr.net') event.respondWith(cacheFirst(request, STATIC_CACHE));
+    return;
+  }
+  if (url.pathname.startsWith('/api/catalog/')) {
+    event.respondWith(cacheFirst(request, CATALOG_CACHE));
+  } else if (url.pathname.startsWith('/api/weather/')) {
+    event.respondWith(staleWhileRevalidate(event, request));
+  } else if (url.pathname === '/' || url.pathname.startsWith('/static/')) {
+    event.respondWith(cacheFirst(request, STATIC_CACHE));
+  }
+});
+
+async function cacheFirst(request, cacheName) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const response = await fetch(request);
+  // CDN scripts are fetched no-cors and come back opaque
+  if (response.ok || response.type === 'opaque') cache.put(request, response.clone());
+  return response;
+}
+
+function maxAgeSeconds(response) {
+  const match = /max-age=(\d+)/.exec(response.headers.get('cache-control') || '');
+  return match ? Number(match[1]) : 0;
+}
+
+function isFresh(response) {
+  const storedAt = Number(response.headers.get(STORED_AT) || 0);
+  return Date.now() < storedAt + maxAgeSeconds(response) * 1000;
+}
+
+// Copy of `response` stamped with the current time, optionally taking the
+// validators (ETag, max-age) from a newer 304
+async function stamp(response, validators) {
+  const headers = new Headers(response.headers);
+  if (validators) {
+    for (const name of ['etag', 'cache-control']) {
+      if (validators.headers.has(name)) headers.set(name, validators.headers.get(name));
+    }
+  }
+  headers.set(STORED_AT, String(Date.now()));
+  return new Response(await response.blob(), { status: response.status, statusText: response.statusText, headers });
+}
+
+async function revalidate(cache, request, cached) {
+  const headers = new Headers(request.headers);
+  const etag = cached && cached.headers.get('etag');
+  if (etag) headers.set('If-None-Match', etag);
+  const response = await fetch(request.url, { headers, cache: 'no-store' });
+  if (response.status === 304 && cached) {
+    const refreshed = await stamp(cached, response);
+    await cache.put(request, refreshed.clone());
+    return refreshed;
+  }
+  if (response.ok) {
+    const stored = await stamp(response);
+    await cache.put(request, stored.clone());
+    return stored;
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event, request) {
+  const cache = await caches.open(FORECAST_CACHE);
+  const cached = await cache.match(request);
+  if (!cached) return revalidate(cache, request, null);
+  if (!isFresh(cached)) {
+    // Offline or upstream errors keep the stale copy
+    event.waitUntil(revalidate(cache, request, cached.clone()).catch(() => null));
+  }
+  return cached;
+}
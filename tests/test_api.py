@@ -1,8 +1,13 @@
 """
 Integration tests for FastAPI endpoints.
 """
+from datetime import datetime, timezone
+import pytest
 from fastapi.testclient import TestClient
+from app import main
 from app.main import app
+from app.models import WeatherCache
+from tests import conftest
 
 client = TestClient(app)
 
@@ -109,4 +114,177 @@ def test_add_duplicate_mountain():
     response = client.post("/api/my/mountains/aneto")
     
     assert response.status_code == 200
-    assert response.json()["ok"] is True
\ No newline at end of file
+    assert response.json()["ok"] is True
+
+def _fake_fetch(calls):
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        calls.append(forecast_hours)
+        return {
+            "hourly": {
+                "time": [f"2025-11-{21 + i // 24:02d}T{i % 24:02d}:00" for i in range(forecast_hours)],
+                "temperature_2m": [5.0] * forecast_hours,
+                "wind_speed_10m": [10.0] * forecast_hours,
+                "precipitation": [0.0] * forecast_hours,
+            }
+        }
+    return fake_fetch
+
+
+def test_weather_horizon_served_from_longest_cached(monkeypatch):
+    """Test shorter horizons are sliced from the cache and longer ones refetch."""
+    calls = []
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch(calls))
+
+    assert len(client.get("/api/weather/aneto?band=mid&horizon_hours=72").json()) == 72
+    assert len(client.get("/api/weather/aneto?band=mid").json()) == 24
+    assert len(client.get("/api/weather/aneto?band=mid&horizon_hours=48").json()) == 48
+    # Aneto's bands span two grid cells
+    assert calls == [72, 72]
+
+    assert len(client.get("/api/weather/aneto?band=mid&horizon_hours=96").json()) == 96
+    assert calls == [72, 72, 96, 96]
+
+
+def test_weather_daily_resolution(monkeypatch):
+    """Test daily resolution returns one aggregate per day."""
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch([]))
+
+    data = client.get("/api/weather/aneto?horizon_hours=72&resolution=daily").json()
+
+    assert len(data) == 3
+    assert data[0]["temp_min_c"] == 5.0
+
+
+def test_weather_invalid_horizon_and_resolution():
+    """Test out-of-range horizon and unknown resolution return 400."""
+    assert client.get("/api/weather/aneto?horizon_hours=0").status_code == 400
+    assert client.get("/api/weather/aneto?horizon_hours=385").status_code == 400
+    assert client.get("/api/weather/aneto?resolution=weekly").status_code == 400
+
+
+def test_weather_one_refresh_serves_all_bands(monkeypatch):
+    """Test one refresh fills every band, corrected by elevation."""
+    calls = []
+    fetch = _fake_fetch(calls)
+
+    async def fetch_with_elevation(lat, lon, forecast_hours=24):
+        payload = await fetch(lat, lon, forecast_hours)
+        payload["elevation"] = 2000
+        return payload
+
+    monkeypatch.setattr(main, "fetch_hourly", fetch_with_elevation)
+
+    base = client.get("/api/weather/aneto?band=base").json()
+    summit = client.get("/api/weather/aneto?band=summit").json()
+
+    # Base is over 2 km from mid and summit, which share a cell
+    assert calls == [24, 24]
+    assert summit[0]["temp_c"] < base[0]["temp_c"]
+
+
+def test_weather_compact_peak_fetched_once(monkeypatch):
+    """Test bands within one grid cell share a single upstream fetch."""
+    calls = []
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch(calls))
+
+    assert client.get("/api/weather/tuc-de-mulleres/bands").status_code == 200
+    assert calls == [24]
+
+
+@pytest.mark.asyncio
+async def test_partial_band_rows_refresh_every_band(monkeypatch):
+    """Test a lone fresh band row (from per-band caching) is not a hit for the whole peak."""
+    calls = []
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch(calls))
+    async with conftest.TestingSessionLocal() as session:
+        session.add(WeatherCache(
+            mountain_id="aneto", band="base", payload=[{"time": "2025-11-21T10:00", "temp_c": 1.0}],
+            horizon_hours=24, fetched_at=datetime.now(timezone.utc), ttl_seconds=3600,
+        ))
+        await session.commit()
+
+        forecasts = await main.load_forecasts(session, "aneto", main.get_catalog().peak_by_id["aneto"], 24)
+
+    assert list(forecasts) == list(main.BANDS)
+    assert all(len(f["payload"]) == 24 for f in forecasts.values())
+    assert calls
+
+
+def test_weather_summary_all_bands(monkeypatch):
+    """Test the summary endpoint returns stats for every band from one refresh."""
+    calls = []
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch(calls))
+
+    data = client.get("/api/weather/aneto/summary").json()
+
+    assert set(data) == {"base", "mid", "summit"}
+    assert data["base"]["next_24h"]["hours"] == 24
+    assert calls == [24, 24]
+
+
+def test_best_windows_ranks_cached_saved_peaks(monkeypatch):
+    """Test best windows ranks saved peaks from cache and lists unscored ones."""
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch([]))
+    client.post("/api/my/mountains/aneto")
+    client.post("/api/my/mountains/posets")
+    client.get("/api/weather/aneto")
+
+    data = client.get("/api/my/best-windows?k=4&window_hours=3").json()
+
+    assert len(data["windows"]) == 4
+    assert all(w["mountain_id"] == "aneto" for w in data["windows"])
+    assert data["windows"][0]["hours"] == 3
+    assert data["windows"][0]["score"] >= data["windows"][-1]["score"]
+    assert data["unscored"] == ["posets"]
+    # Windows of one peak never overlap, whichever band they are on
+    starts = sorted(w["start"] for w in data["windows"])
+    ends = sorted(w["end"] for w in data["windows"])
+    assert all(end < start for end, start in zip(ends, starts[1:]))
+
+
+def test_best_windows_invalid_params():
+    """Test out-of-range k and window_hours return 400."""
+    assert client.get("/api/my/best-windows?k=0").status_code == 400
+    assert client.get("/api/my/best-windows?window_hours=25").status_code == 400
+
+
+def test_weather_all_bands_in_one_request(monkeypatch):
+    """Test the batch endpoint returns every band and summary from one fetch."""
+    calls = []
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch(calls))
+
+    data = client.get("/api/weather/aneto/bands?horizon_hours=48").json()
+
+    assert set(data["bands"]) == {"base", "mid", "summit"}
+    assert set(data["summary"]) == {"base", "mid", "summit"}
+    assert all(len(rows) == 48 for rows in data["bands"].values())
+    assert data["fetched_at"]
+    assert calls == [48, 48]
+
+
+def test_weather_etag_and_not_modified(monkeypatch):
+    """Test forecasts carry an ETag and max-age, and revalidate with 304."""
+    monkeypatch.setattr(main, "fetch_hourly", _fake_fetch([]))
+
+    first = client.get("/api/weather/aneto?band=mid")
+    etag = first.headers["etag"]
+    max_age = int(first.headers["cache-control"].split("max-age=")[1])
+
+    assert 0 < max_age <= main.TTL_SECONDS
+    again = client.get("/api/weather/aneto?band=mid", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    daily = client.get("/api/weather/aneto?band=mid&resolution=daily", headers={"If-None-Match": etag})
+    assert daily.status_code == 200
+    assert daily.headers["etag"] != etag
+
+
+def test_service_worker_served_from_root():
+    """Test the service worker is served at /sw.js and revalidated on every load."""
+    response = client.get("/sw.js")
+
+    assert response.status_code == 200
+    assert "javascript" in response.headers["content-type"]
+    assert response.headers["cache-control"] == "no-cache"
@@ -0,0 +1,203 @@
+"""
+Tests for the forecast history archive and its export endpoint.
+"""
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.archive import COMPACTED_NAME, ForecastArchive, iter_csv
+from app.main import app
+
+client = TestClient(app)
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(main.settings, "ADMIN_TOKEN", "secret")
+
+ROWS = [
+    {"time": "2025-11-21T10:00", "temp_c": 1.0, "wind_speed_kmh": 10.0, "precip_mm": 0.0},
+    {"time": "2025-11-21T11:00", "temp_c": 2.0, "wind_speed_kmh": 12.0, "precip_mm": 0.5},
+]
+
+
+def _record(mountain_id, band, day, hour=10):
+    return {
+        "fetched_at": datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc).isoformat(),
+        "mountain_id": mountain_id,
+        "band": band,
+        "horizon_hours": 2,
+        "rows": ROWS,
+    }
+
+
+def test_write_batch_partitions_by_day(tmp_path):
+    """Test records land in one partition per fetch day and read back in order."""
+    archive = ForecastArchive(str(tmp_path))
+    archive.write_batch([
+        _record("aneto", "base", date(2026, 10, 1)),
+        _record("aneto", "base", date(2026, 10, 2)),
+        _record("posets", "mid", date(2026, 10, 2)),
+    ])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["date=2026-10-01", "date=2026-10-02"]
+    assert [r["fetched_at"][:10] for r in archive.iter_records()] == ["2026-10-01", "2026-10-02", "2026-10-02"]
+
+
+def test_iter_records_filters(tmp_path):
+    """Test peak, band and inclusive date range filters."""
+    archive = ForecastArchive(str(tmp_path))
+    archive.write_batch([
+        _record("aneto", "base", date(2026, 10, d)) for d in (1, 2, 3)
+    ] + [_record("aneto", "summit", date(2026, 10, 2)), _record("posets", "base", date(2026, 10, 2))])
+
+    got = list(archive.iter_records(date(2026, 10, 2), date(2026, 10, 3), "aneto", "base"))
+
+    assert [r["fetched_at"][:10] for r in got] == ["2026-10-02", "2026-10-03"]
+
+
+def test_maintain_compacts_and_applies_retention(tmp_path):
+    """Test old partitions are gzipped, expired ones deleted, today's left alone."""
+    archive = ForecastArchive(str(tmp_path), retention_days=10, compact_after_days=2)
+    archive.write_batch([_record("aneto", "base", date(2026, 10, d)) for d in (1, 15, 19, 20)])
+    archive.write_batch([_record("aneto", "mid", date(2026, 10, 15))])
+
+    result = archive.maintain(today=date(2026, 10, 20))
+
+    assert result == {"deleted": 1, "compacted": 1}
+    assert not (tmp_path / "date=2026-10-01").exists()
+    assert [p.name for p in (tmp_path / "date=2026-10-15").iterdir()] == [COMPACTED_NAME]
+    assert list((tmp_path / "date=2026-10-19").glob("part-*.ndjson"))
+    assert [r["band"] for r in archive.iter_records(date(2026, 10, 15), date(2026, 10, 15))] == ["base", "mid"]
+
+
+def test_iter_records_skips_partial_last_line(tmp_path):
+    """Test a line still being appended by another worker is not read."""
+    archive = ForecastArchive(str(tmp_path))
+    archive.write_batch([_record("aneto", "base", date(2026, 10, 1))])
+    part = next((tmp_path / "date=2026-10-01").glob("part-*.ndjson"))
+    with open(part, "ab") as f:
+        f.write(b'{"fetched_at": "2026-10-01T11:00:00+00:00", "mount')
+
+    assert [r["band"] for r in archive.iter_records()] == ["base"]
+
+
+def test_maintenance_waits_for_readers(tmp_path):
+    """Test compaction never rewrites a partition an export is reading."""
+    archive = ForecastArchive(str(tmp_path), compact_after_days=1)
+    archive.write_batch([_record("aneto", band, date(2026, 10, 1)) for band in ("base", "mid", "summit")])
+    other_worker = ForecastArchive(str(tmp_path), compact_after_days=1)
+
+    reader = archive.iter_records()
+    first = next(reader)
+    assert other_worker.maintain(today=date(2026, 10, 5)) == {"deleted": 0, "compacted": 0}
+    rest = list(reader)
+
+    assert [r["band"] for r in [first] + rest] == ["base", "mid", "summit"]
+    assert other_worker.maintain(today=date(2026, 10, 5)) == {"deleted": 0, "compacted": 1}
+
+
+def test_iter_csv_one_row_per_hour():
+    """Test CSV export flattens each record into hourly rows."""
+    out = "".join(iter_csv(iter([_record("aneto", "base", date(2026, 10, 1))])))
+
+    rows = list(csv.DictReader(io.StringIO(out)))
+
+    assert len(rows) == 2
+    assert rows[1]["mountain_id"] == "aneto"
+    assert rows[1]["temp_c"] == "2.0"
+    assert rows[1]["cloud_cover"] == ""
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_off_request_path(tmp_path):
+    """Test queued records are written by the background task and flushed on stop."""
+    archive = ForecastArchive(str(tmp_path), batch_size=2, flush_seconds=60)
+    archive.record("aneto", "base", datetime.now(timezone.utc), 2, ROWS)  # not started: ignored
+    await archive.start()
+    for band in ("base", "mid", "summit"):
+        archive.record("aneto", band, datetime.now(timezone.utc), 2, ROWS)
+
+    await archive.stop()
+
+    assert sorted(r["band"] for r in archive.iter_records()) == ["base", "mid", "summit"]
+
+
+@pytest.mark.asyncio
+async def test_writer_survives_write_errors(monkeypatch, tmp_path):
+    """Test a failed batch is logged and counted, and stop still returns with a full queue."""
+    archive = ForecastArchive(str(tmp_path), batch_size=1, flush_seconds=60, max_queue=2)
+    failures = []
+
+    def failing_write(records):
+        failures.append(len(records))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(archive, "write_batch", failing_write)
+    await archive.start()
+    for _ in range(5):
+        archive.record("aneto", "base", datetime.now(timezone.utc), 2, ROWS)
+    await asyncio.sleep(0.05)
+
+    assert not archive._task.done()
+    await asyncio.wait_for(archive.stop(), 2)
+    assert failures
+
+
+def test_refresh_is_archived(monkeypatch):
+    """Test a cache refresh queues one archive record per band."""
+    recorded = []
+
+    class FakeArchive:
+        def record(self, mountain_id, band, fetched_at, horizon_hours, rows):
+            recorded.append((mountain_id, band, horizon_hours))
+
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        return {"hourly": {"time": ["2025-11-21T10:00"], "temperature_2m": [5.0],
+                           "wind_speed_10m": [10.0], "precipitation": [0.0]}}
+
+    monkeypatch.setattr(main, "fetch_hourly", fake_fetch)
+    monkeypatch.setattr(main, "ARCHIVE", FakeArchive())
+    client.get("/api/weather/aneto")
+    client.get("/api/weather/aneto")
+
+    assert sorted(recorded) == [("aneto", "base", 24), ("aneto", "mid", 24), ("aneto", "summit", 24)]
+
+
+def test_export_endpoint_streams_filtered(monkeypatch, tmp_path, admin_token):
+    """Test the export endpoint streams NDJSON and CSV with filters applied."""
+    archive = ForecastArchive(str(tmp_path))
+    archive.write_batch([_record("aneto", "base", date(2026, 10, 1)), _record("posets", "base", date(2026, 10, 1))])
+    monkeypatch.setattr(main, "ARCHIVE", archive)
+
+    ndjson = client.get("/api/admin/archive/export?mountain_id=aneto&start=2026-10-01", headers=TOKEN)
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["mountain_id"] for line in ndjson.text.splitlines()] == ["aneto"]
+
+    csv_response = client.get("/api/admin/archive/export?format=csv&band=base", headers=TOKEN)
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    assert len(csv_response.text.strip().splitlines()) == 1 + 2 * 2
+
+
+def test_export_endpoint_validation(admin_token):
+    """Test bad export parameters are rejected."""
+    assert client.get("/api/admin/archive/export?format=xml", headers=TOKEN).status_code == 400
+    assert client.get("/api/admin/archive/export?start=yesterday", headers=TOKEN).status_code == 400
+    assert client.get("/api/admin/archive/export?band=top", headers=TOKEN).status_code == 400
+    assert client.get("/api/admin/archive/export?mountain_id=nope", headers=TOKEN).status_code == 404
+
+
+def test_export_requires_admin_token(monkeypatch):
+    """Test the export is refused without a configured token and with a wrong one."""
+    monkeypatch.setattr(main.settings, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/archive/export").status_code == 403
+
+    monkeypatch.setattr(main.settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/admin/archive/export", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/admin/archive/export", headers=TOKEN).status_code == 200
@@ -0,0 +1,59 @@
+"""
+Tests for benchmark support code (Open-Meteo stub and result comparison).
+"""
+from starlette.testclient import TestClient
+from benchmarks.compare import compare, direction
+from benchmarks.stub_openmeteo import StubConfig, build_payload, create_app
+from app.weather import slice_next_24h
+
+
+def test_stub_payload_is_processable():
+    """Test stub payload has Open-Meteo shape accepted by slice_next_24h."""
+    payload = build_payload(42.63, 0.65, 24)
+
+    assert len(payload["hourly"]["time"]) == 24
+    assert "elevation" in payload
+    assert len(slice_next_24h(payload, elev_target_m=3000)) == 24
+
+
+def test_stub_honours_forecast_hours_and_counts_requests():
+    """Test stub returns requested horizon and counts requests."""
+    config = StubConfig()
+    client = TestClient(create_app(config))
+
+    r = client.get("/v1/forecast", params={"latitude": 42.6, "longitude": 0.6, "forecast_hours": 48})
+
+    assert r.status_code == 200
+    assert len(r.json()["hourly"]["time"]) == 48
+    assert config.requests == 1
+
+
+def test_stub_error_injection():
+    """Test error_rate=1 makes every request fail with 503."""
+    config = StubConfig(error_rate=1.0)
+    client = TestClient(create_app(config))
+
+    r = client.get("/v1/forecast", params={"latitude": 42.6, "longitude": 0.6})
+
+    assert r.status_code == 503
+    assert config.errors == 1
+
+
+def test_direction_by_metric_suffix():
+    """Test metric suffixes decide which way is better."""
+    assert direction("p50_ms") == -1
+    assert direction("upstream_calls") == -1
+    assert direction("throughput_rps") == 1
+    assert direction("peaks") is None
+
+
+def test_compare_flags_regressions():
+    """Test compare flags only changes beyond threshold in the wrong direction."""
+    baseline = {"s": {"p50_ms": 10.0, "throughput_rps": 100.0, "mean_ms": 10.0}}
+    current = {"s": {"p50_ms": 13.0, "throughput_rps": 150.0, "mean_ms": 10.5}}
+
+    rows = {r["metric"]: r for r in compare(baseline, current, threshold=0.15)}
+
+    assert rows["p50_ms"]["regression"] is True
+    assert rows["throughput_rps"]["regression"] is False
+    assert rows["mean_ms"]["regression"] is False
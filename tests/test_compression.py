@@ -0,0 +1,116 @@
+"""
+Tests for response compression and fast JSON rendering.
+"""
+import gzip
+import json
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app import responses
+from app.compression import CompressionMiddleware, choose_encoding
+from app.main import app
+
+BIG = {"rows": [{"time": f"2025-01-01T{h:02d}:00", "temp_c": 1.5} for h in range(200)]}
+
+
+def make_client():
+    demo = FastAPI(default_response_class=responses.FastJSONResponse)
+
+    @demo.get("/big")
+    def big():
+        return BIG
+
+    @demo.get("/small")
+    def small():
+        return {"ok": True}
+
+    @demo.get("/stream")
+    def stream():
+        chunks = (b"x" * 2000 for _ in range(5))
+        return StreamingResponse(chunks, media_type="text/plain")
+
+    @demo.get("/binary")
+    def binary():
+        return PlainTextResponse(b"\x00" * 5000, media_type="application/octet-stream")
+
+    demo.add_middleware(CompressionMiddleware, minimum_size=1024, gzip_level=6, brotli_quality=4)
+    return TestClient(demo)
+
+
+def raw_get(client, path, accept):
+    # Disable httpx's transparent decoding by asking for the raw stream
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_choose_encoding_prefers_brotli():
+    """Test brotli wins over gzip and q=0 excludes an encoding."""
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+def test_large_json_is_gzipped():
+    """Test bodies above the threshold are gzip-compressed with Vary set."""
+    r, body = raw_get(make_client(), "/big", "gzip")
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in r.headers["vary"].lower()
+    assert int(r.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == BIG
+
+
+def test_large_json_is_brotli_compressed():
+    """Test brotli is used when accepted."""
+    r, body = raw_get(make_client(), "/big", "br")
+
+    assert r.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(body)) == BIG
+
+
+def test_small_and_binary_responses_untouched():
+    """Test small bodies and non-text types are not compressed."""
+    client = make_client()
+
+    r, _ = raw_get(client, "/small", "gzip")
+    assert "content-encoding" not in r.headers
+
+    r, body = raw_get(client, "/binary", "gzip")
+    assert "content-encoding" not in r.headers
+    assert len(body) == 5000
+
+
+def test_streaming_response_compressed():
+    """Test streamed bodies are compressed chunk by chunk."""
+    r, body = raw_get(make_client(), "/stream", "gzip")
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert gzip.decompress(body) == b"x" * 10000
+
+
+def test_no_accept_encoding_passthrough():
+    """Test clients that don't accept compression get identity bodies."""
+    r, body = raw_get(make_client(), "/big", "identity")
+
+    assert "content-encoding" not in r.headers
+    assert json.loads(body) == BIG
+
+
+def test_fast_json_stdlib_fallback_matches(monkeypatch):
+    """Test the stdlib fallback produces the same compact JSON as orjson."""
+    fast = responses.dumps(BIG)
+    monkeypatch.setattr(responses, "orjson", None)
+
+    assert responses.dumps(BIG) == fast
+    assert responses.dumps({"name": "Pic d'Aneto ñ"}) == '{"name":"Pic d\'Aneto ñ"}'.encode()
+
+
+def test_app_compresses_catalog():
+    """Test the app compresses the full peak list."""
+    r, body = raw_get(TestClient(app), "/api/catalog/peaks_all", "gzip")
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(body))) > 0
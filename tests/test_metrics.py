@@ -0,0 +1,109 @@
+"""
+Tests for the Prometheus-style metrics registry and /metrics endpoint.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from fastapi.testclient import TestClient
+from app import main, metrics
+from app.main import app
+
+client = TestClient(app)
+
+MOCK_PAYLOAD = {
+    "hourly": {
+        "time": ["2025-11-21T10:00"],
+        "temperature_2m": [5.0],
+        "wind_speed_10m": [10.0],
+        "precipitation": [0.0],
+    }
+}
+
+
+def test_counter_render():
+    """Test counters render with labels in exposition format."""
+    registry = metrics.Registry()
+    c = metrics.Counter("things_total", "Things.", ("kind",), registry=registry)
+    c.labels("a").inc()
+    c.labels("a").inc(2)
+
+    out = registry.render()
+
+    assert "# TYPE things_total counter" in out
+    assert 'things_total{kind="a"} 3' in out
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets accumulate and include +Inf, sum and count."""
+    registry = metrics.Registry()
+    h = metrics.Histogram("lat_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+    h.observe(0.05)
+    h.observe(0.1)
+    h.observe(0.5)
+    h.observe(5.0)
+
+    out = registry.render()
+
+    assert 'lat_seconds_bucket{le="0.1"} 2' in out
+    assert 'lat_seconds_bucket{le="1"} 3' in out
+    assert 'lat_seconds_bucket{le="+Inf"} 4' in out
+    assert "lat_seconds_count 4" in out
+    assert "lat_seconds_sum 5.65" in out
+
+
+def test_label_values_are_escaped():
+    """Test quotes in label values are escaped."""
+    registry = metrics.Registry()
+    c = metrics.Counter("esc_total", "Escaping.", ("v",), registry=registry)
+    c.labels('a"b').inc()
+
+    assert 'esc_total{v="a\\"b"} 1' in registry.render()
+
+
+def test_duplicate_registration_rejected():
+    """Test registering the same metric name twice raises."""
+    registry = metrics.Registry()
+    metrics.Counter("dup_total", "Dup.", registry=registry)
+    with pytest.raises(ValueError):
+        metrics.Counter("dup_total", "Dup.", registry=registry)
+
+
+def test_metrics_endpoint_reports_route_template():
+    """Test request latency is labelled by route template, not raw path."""
+    client.get("/api/catalog/peaks/aneto")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/catalog/peaks/{peak_id}"' in response.text
+    assert 'route="/api/catalog/peaks/aneto"' not in response.text
+
+
+def test_weather_cache_hit_miss_counters(monkeypatch):
+    """Test weather endpoint counts a miss then a hit."""
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        return MOCK_PAYLOAD
+
+    monkeypatch.setattr(main, "fetch_hourly", fake_fetch)
+    cache = metrics.WEATHER_CACHE_REQUESTS
+    misses = cache.labels("miss").value
+    hits = cache.labels("hit").value
+
+    assert client.get("/api/weather/aneto?band=base").status_code == 200
+    assert client.get("/api/weather/aneto?band=base").status_code == 200
+
+    assert cache.labels("miss").value == misses + 1
+    assert cache.labels("hit").value == hits + 1
+
+
+def test_instrument_engine_records_query_timings():
+    """Test SQLAlchemy event hooks record statement durations."""
+    engine = create_engine("sqlite:///:memory:")
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(engine)  # idempotent
+    before = metrics.DB_QUERY_DURATION.labels("SELECT").count
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert metrics.DB_QUERY_DURATION.labels("SELECT").count == before + 1
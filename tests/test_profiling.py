@@ -0,0 +1,117 @@
+"""
+Tests for opt-in per-request profiling.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app import profiling
+from app.config import settings
+from app.main import app
+
+engine = create_engine("sqlite:///:memory:")
+profiling.instrument_engine(engine)
+
+
+def make_client(store, **kwargs):
+    demo = FastAPI(default_response_class=profiling.TimedJSONResponse)
+
+    @demo.get("/work/{item}")
+    def work(item: str):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        profiling.record_upstream(0.25)
+        return {"item": item, "rows": list(range(100))}
+
+    demo.add_middleware(profiling.ProfilingMiddleware, store=store, **kwargs)
+    return TestClient(demo)
+
+
+def test_header_triggers_profile_with_time_split():
+    """Test a request with the profiling header is profiled and split by category."""
+    store = profiling.ProfileStore(5)
+    client = make_client(store, token="s3cret")
+
+    assert client.get("/work/a", headers={"X-Profile": "s3cret"}).status_code == 200
+
+    [summary] = store.list()
+    assert summary["route"] == "/work/{item}"
+    assert summary["status"] == 200
+    assert summary["db_queries"] == 1
+    assert summary["upstream_calls"] == 1
+    assert summary["upstream_ms"] == 250.0
+    assert summary["serialization_ms"] > 0
+    assert "stats" not in summary
+    assert "cumulative" in store.get(summary["id"])["stats"]
+
+
+def test_requests_without_header_are_not_profiled():
+    """Test requests are untouched when not selected."""
+    store = profiling.ProfileStore(5)
+    client = make_client(store)
+
+    client.get("/work/a")
+    client.get("/work/a", headers={"X-Profile": "0"})
+
+    assert store.list() == []
+
+
+def test_sample_rate_profiles_every_request():
+    """Test sample_rate=1 profiles requests without the header."""
+    store = profiling.ProfileStore(5)
+    client = make_client(store, sample_rate=1.0)
+
+    client.get("/work/a")
+
+    assert len(store.list()) == 1
+
+
+def test_store_keeps_last_n_profiles():
+    """Test the store is bounded and returns newest first."""
+    store = profiling.ProfileStore(2)
+    client = make_client(store, token="s3cret")
+
+    for item in ("a", "b", "c"):
+        client.get(f"/work/{item}", headers={"X-Profile": "s3cret"})
+
+    assert [p["path"] for p in store.list()] == ["/work/c", "/work/b"]
+
+
+def test_header_must_match_token_when_configured():
+    """Test the profiling header must carry the admin token when one is set."""
+    store = profiling.ProfileStore(5)
+    client = make_client(store, token="s3cret")
+
+    client.get("/work/a", headers={"X-Profile": "1"})
+    assert store.list() == []
+
+    client.get("/work/a", headers={"X-Profile": "s3cret"})
+    assert len(store.list()) == 1
+
+
+def test_header_ignored_without_token():
+    """Test the profiling header selects nothing when no token is configured."""
+    store = profiling.ProfileStore(5)
+    client = make_client(store)
+
+    client.get("/work/a", headers={"X-Profile": "1"})
+
+    assert store.list() == []
+
+
+def test_admin_profiles_require_token(monkeypatch):
+    """Test profile endpoints are refused until a token is configured and sent."""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    client = TestClient(app)
+    assert client.get("/api/admin/profiles").status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/api/admin/profiles").status_code == 403
+    assert client.get("/api/admin/profiles", headers={"X-Admin-Token": "s3cret"}).status_code == 200
+
+
+def test_admin_profiles_disabled_by_default():
+    """Test admin profile endpoints are hidden when profiling is disabled."""
+    client = TestClient(app)
+
+    assert client.get("/api/admin/profiles").status_code == 404
@@ -0,0 +1,84 @@
+"""
+Unit tests for climbing-window scoring and ranking.
+"""
+from app.ranking import hourly_scores, rank_windows
+
+
+def _row(gust=None, wind=10.0, precip=0.0, cloud=0):
+    return {"wind_gust_kmh": gust, "wind_speed_kmh": wind, "precip_mm": precip, "cloud_cover": cloud}
+
+
+def test_hourly_scores_ideal_and_worst():
+    """Test calm, dry, clear hours score 100 and stormy hours score 0."""
+    scores = hourly_scores([_row(gust=10.0), _row(gust=80.0, precip=5.0, cloud=100)])
+
+    assert scores == [100.0, 0.0]
+
+
+def test_hourly_scores_falls_back_to_wind_speed():
+    """Test missing gusts fall back to sustained wind speed."""
+    assert hourly_scores([_row(gust=None, wind=40.0)]) == [75.0]
+
+
+def test_hourly_scores_missing_cloud_counts_half():
+    """Test missing cloud cover contributes half its weight."""
+    assert hourly_scores([_row(gust=10.0, cloud=None)]) == [90.0]
+
+
+def test_hourly_scores_empty():
+    """Test no rows give no scores."""
+    assert hourly_scores([]) == []
+
+
+def test_rank_windows_orders_best_first():
+    """Test top-k picks the best hours across series, best first."""
+    series = [([10.0, 50.0, 20.0], 0), ([90.0, 30.0], 0)]
+
+    assert rank_windows(series, k=2) == [(1, 0, 90.0), (0, 1, 50.0)]
+
+
+def test_rank_windows_mean_over_window():
+    """Test multi-hour windows are scored by their mean."""
+    series = [([10.0, 50.0, 70.0, 0.0], 0)]
+
+    assert rank_windows(series, k=1, window_hours=2) == [(0, 1, 60.0)]
+
+
+def test_rank_windows_skips_past_hours():
+    """Test hours before ``skip`` are never ranked."""
+    series = [([100.0, 20.0, 30.0], 1)]
+
+    assert rank_windows(series, k=5) == [(0, 2, 30.0), (0, 1, 20.0)]
+
+
+def test_rank_windows_ragged_series():
+    """Test windows never run past the end of a shorter series."""
+    series = [([80.0], 0), ([10.0, 20.0, 30.0], 0)]
+
+    assert rank_windows(series, k=5, window_hours=2) == [(1, 1, 25.0)]
+
+
+def test_rank_windows_suppresses_overlapping_windows():
+    """Test one good stretch yields non-overlapping windows, not one per shifted start."""
+    scores = [0.0] * 10 + [90.0] * 3 + [85.0] * 3 + [0.0] * 8
+
+    windows = rank_windows([(scores, 0)], k=5, window_hours=3)
+
+    assert windows[:2] == [(0, 10, 90.0), (0, 13, 85.0)]
+    assert len(windows) == 5
+    starts = sorted(start for _, start, _ in windows)
+    assert all(b - a >= 3 for a, b in zip(starts, starts[1:]))
+
+
+def test_rank_windows_groups_share_hours():
+    """Test a stretch shared by series of one group (bands of a peak) is listed once."""
+    series = [
+        ([0.0, 80.0, 80.0, 0.0, 0.0, 0.0], 0),
+        ([0.0, 70.0, 70.0, 0.0, 0.0, 0.0], 0),
+        ([0.0, 75.0, 75.0, 0.0, 0.0, 0.0], 0),
+    ]
+
+    windows = rank_windows(series, k=3, window_hours=2, groups=["aneto", "aneto", "posets"])
+
+    assert windows[:2] == [(0, 1, 80.0), (2, 1, 75.0)]
+    assert windows[2][2] == 0.0
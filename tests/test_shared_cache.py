@@ -0,0 +1,183 @@
+"""
+Tests for the cross-worker shared forecast cache.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.main import app
+from app.shared_cache import SharedForecastCache, SharedSemaphore
+
+client = TestClient(app)
+
+ROWS = [{"time": "2025-11-21T10:00", "temp_c": 5.0}]
+SUMMARY = {"next_24h": {"hours": 1}}
+
+
+def test_put_get_roundtrip(tmp_path):
+    """Test entries round-trip with their header fields."""
+    cache = SharedForecastCache(str(tmp_path))
+    now = time.time()
+    cache.put("aneto", "base", ROWS, SUMMARY, 24, now, 60)
+
+    entry = cache.get("aneto", "base")
+
+    assert entry["payload"] == ROWS
+    assert entry["summary"] == SUMMARY
+    assert entry["horizon_hours"] == 24
+    assert entry["expires_at"] == pytest.approx(now + 60)
+    assert cache.get("aneto", "mid") is None
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    """Test entries past their TTL are not returned."""
+    cache = SharedForecastCache(str(tmp_path))
+    cache.put("aneto", "base", ROWS, SUMMARY, 24, time.time() - 120, 60)
+
+    assert cache.get("aneto", "base") is None
+
+
+def test_refresh_visible_to_other_instances(tmp_path):
+    """Test a write by one worker replaces what another worker has decoded."""
+    a = SharedForecastCache(str(tmp_path))
+    b = SharedForecastCache(str(tmp_path))
+    a.put("aneto", "base", ROWS, SUMMARY, 24, time.time(), 60)
+    assert b.get("aneto", "base")["horizon_hours"] == 24
+
+    a.put("aneto", "base", ROWS * 2, SUMMARY, 48, time.time(), 60)
+
+    assert b.get("aneto", "base")["horizon_hours"] == 48
+    assert len(b.get("aneto", "base")["payload"]) == 2
+
+
+def test_entry_written_by_another_process(tmp_path):
+    """Test an entry written by a separate process is readable here."""
+    code = (
+        "import sys, time; from app.shared_cache import SharedForecastCache; "
+        "SharedForecastCache(sys.argv[1]).put('aneto', 'summit', [{'t': 1}], {}, 72, time.time(), 60)"
+    )
+    subprocess.run([sys.executable, "-c", code, str(tmp_path)], check=True)
+
+    assert SharedForecastCache(str(tmp_path)).get("aneto", "summit")["horizon_hours"] == 72
+
+
+def test_app_imports_with_shared_cache_enabled(tmp_path):
+    """Test the app module builds its shared cache from the settings."""
+    code = "from app import main; print(type(main.SHARED_CACHE).__name__, main.SHARED_CACHE.directory)"
+    env = {**os.environ, "SHARED_CACHE_ENABLED": "true", "SHARED_CACHE_DIR": str(tmp_path)}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == ["SharedForecastCache", str(tmp_path)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_lock_excludes_other_process(tmp_path):
+    """Test the refresh lock waits while another process holds it."""
+    code = (
+        "import fcntl, os, sys, time; "
+        "fd = os.open(os.path.join(sys.argv[1], 'aneto.lock'), os.O_RDWR | os.O_CREAT); "
+        "fcntl.flock(fd, fcntl.LOCK_EX); print('locked', flush=True); time.sleep(0.3)"
+    )
+    holder = subprocess.Popen([sys.executable, "-c", code, str(tmp_path)], stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        cache = SharedForecastCache(str(tmp_path), lock_timeout=0.05)
+        async with cache.refresh_lock("aneto") as locked:
+            assert locked is False
+
+        cache.lock_timeout = 5
+        start = time.monotonic()
+        async with cache.refresh_lock("aneto") as locked:
+            assert locked is True
+        assert time.monotonic() - start > 0.05
+    finally:
+        holder.wait()
+
+
+@pytest.mark.asyncio
+async def test_shared_semaphore_limits_holders(tmp_path):
+    """Test the slot semaphore admits at most ``value`` holders."""
+    a = SharedSemaphore(str(tmp_path), 1)
+    b = SharedSemaphore(str(tmp_path), 1)
+    await a.acquire()
+
+    waiter = asyncio.ensure_future(b.acquire())
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    a.release()
+    assert await asyncio.wait_for(waiter, 1)
+    b.release()
+
+
+def test_weather_served_from_shared_cache(monkeypatch, tmp_path):
+    """Test a forecast refreshed by another worker is served without a fetch."""
+    calls = []
+
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        calls.append(forecast_hours)
+        return {"hourly": {"time": ["2025-11-21T10:00"], "temperature_2m": [5.0]}}
+
+    monkeypatch.setattr(main, "fetch_hourly", fake_fetch)
+    monkeypatch.setattr(main, "SHARED_CACHE", SharedForecastCache(str(tmp_path)))
+    other_worker = SharedForecastCache(str(tmp_path))
+    for band in main.BANDS:
+        other_worker.put("aneto", band, [{"time": "2025-11-21T10:00", "temp_c": -3.0}], SUMMARY, 24, time.time(), 60)
+
+    response = client.get("/api/weather/aneto?band=summit")
+
+    assert response.status_code == 200
+    assert response.json()[0]["temp_c"] == -3.0
+    assert calls == []
+
+
+def test_refresh_populates_shared_cache(monkeypatch, tmp_path):
+    """Test a refresh writes every band to the shared cache."""
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        return {
+            "hourly": {
+                "time": ["2025-11-21T10:00"],
+                "temperature_2m": [5.0],
+                "wind_speed_10m": [10.0],
+                "precipitation": [0.0],
+            }
+        }
+
+    cache = SharedForecastCache(str(tmp_path))
+    monkeypatch.setattr(main, "fetch_hourly", fake_fetch)
+    monkeypatch.setattr(main, "SHARED_CACHE", cache)
+
+    assert client.get("/api/weather/aneto?band=base").status_code == 200
+
+    for band in main.BANDS:
+        entry = cache.get("aneto", band)
+        assert entry["horizon_hours"] == 24
+        assert len(entry["payload"]) == 1
+
+
+def test_incomplete_shared_entry_falls_back_to_refresh(monkeypatch, tmp_path):
+    """Test a missing band in the shared cache triggers a refresh instead of a partial answer."""
+    async def fake_fetch(lat, lon, forecast_hours=24):
+        return {
+            "hourly": {
+                "time": ["2025-11-21T10:00"],
+                "temperature_2m": [5.0],
+                "wind_speed_10m": [10.0],
+                "precipitation": [0.0],
+            }
+        }
+
+    cache = SharedForecastCache(str(tmp_path))
+    monkeypatch.setattr(main, "fetch_hourly", fake_fetch)
+    monkeypatch.setattr(main, "SHARED_CACHE", cache)
+    cache.put("aneto", "base", [{"time": "2025-11-21T10:00", "temp_c": -3.0}], SUMMARY, 24, time.time(), 60)
+
+    response = client.get("/api/weather/aneto/bands")
+
+    assert response.status_code == 200
+    assert set(response.json()["bands"]) == set(main.BANDS)
+    assert cache.get("aneto", "summit") is not None
@@ -0,0 +1,119 @@
+"""
+Tests for the catalog snapshot, schema version marker and lifespan startup.
+"""
+import json
+import os
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import catalog_snapshot, db, main, metrics
+from app.catalog_snapshot import CATALOG_PATH, build_snapshot, compile_catalog, load_catalog
+from app.models import ADDED_COLUMNS, SCHEMA_VERSION, WeatherCache
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test a built snapshot loads and matches the compiled JSON."""
+    snapshot = tmp_path / "catalog.pickle"
+    build_snapshot(CATALOG_PATH, snapshot)
+
+    catalog, from_snapshot = load_catalog(CATALOG_PATH, snapshot)
+
+    assert from_snapshot
+    assert catalog == compile_catalog(json.loads(CATALOG_PATH.read_bytes()))
+    assert "aneto" in catalog.peak_by_id
+
+
+def test_snapshot_ignored_when_source_changes(tmp_path):
+    """Test a snapshot built from other JSON falls back to parsing."""
+    source = tmp_path / "catalog.json"
+    snapshot = tmp_path / "catalog.pickle"
+    source.write_bytes(CATALOG_PATH.read_bytes())
+    build_snapshot(source, snapshot)
+    raw = json.loads(source.read_bytes())
+    raw["areas"] = raw["areas"][:1]
+    source.write_text(json.dumps(raw))
+
+    catalog, from_snapshot = load_catalog(source, snapshot)
+
+    assert not from_snapshot
+    assert len(catalog.areas) == 1
+
+
+def test_snapshot_ignored_when_source_touched(tmp_path):
+    """Test a newer mtime on same-size JSON invalidates the snapshot."""
+    source = tmp_path / "catalog.json"
+    snapshot = tmp_path / "catalog.pickle"
+    source.write_bytes(CATALOG_PATH.read_bytes())
+    build_snapshot(source, snapshot)
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    _, from_snapshot = load_catalog(source, snapshot)
+
+    assert not from_snapshot
+
+
+def test_corrupt_snapshot_falls_back(tmp_path):
+    """Test an unreadable snapshot is ignored."""
+    snapshot = tmp_path / "catalog.pickle"
+    snapshot.write_bytes(b"not a pickle")
+
+    _, from_snapshot = load_catalog(CATALOG_PATH, snapshot)
+
+    assert not from_snapshot
+
+
+@pytest.mark.asyncio
+async def test_init_schema_skips_when_version_matches(monkeypatch, tmp_path):
+    """Test create_all runs once, then the version marker skips it."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/schema.db")
+    monkeypatch.setattr(db, "engine", engine)
+    try:
+        assert await db.init_schema(SCHEMA_VERSION) is True
+        assert await db.init_schema(SCHEMA_VERSION) is False
+        assert await db.init_schema(SCHEMA_VERSION + 1) is True
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_init_schema_migrates_baseline_database(monkeypatch, tmp_path):
+    """Test a database created before the added columns existed is upgraded."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/old.db")
+    monkeypatch.setattr(db, "engine", engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE weather_cache (id INTEGER PRIMARY KEY, mountain_id VARCHAR NOT NULL, "
+                "band VARCHAR NOT NULL, payload JSON NOT NULL, fetched_at DATETIME, ttl_seconds INTEGER, "
+                "CONSTRAINT uniq_mtn_band UNIQUE (mountain_id, band))"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO weather_cache (mountain_id, band, payload, ttl_seconds) VALUES ('aneto', 'base', '[]', 60)"
+            )
+
+        assert await db.init_schema(SCHEMA_VERSION, ADDED_COLUMNS) is True
+
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(WeatherCache))).one()
+        assert row.mountain_id == "aneto"
+        assert all(getattr(row, column) is None for _, column in ADDED_COLUMNS)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_records_startup_phases(monkeypatch, tmp_path):
+    """Test lifespan loads the catalog, creates the schema and reports timings."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/startup.db")
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(catalog_snapshot, "_catalog", None)
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            pass
+    finally:
+        await engine.dispose()
+
+    assert set(main.STARTUP_TIMINGS) == {"import", "catalog", "schema", "total"}
+    assert catalog_snapshot._catalog is not None
+    assert metrics.STARTUP_PHASE_DURATION.labels("total").value == main.STARTUP_TIMINGS["total"]
@@ -7,6 +7,12 @@ from app.weather import (
     get_weather_description,
     get_wind_direction,
     slice_next_24h,
+    slice_hours,
+    aggregate_forecast,
+    cell_groups,
+    cell_point,
+    distance_km,
+    summarize_forecast,
     LAPSE_RATE_K_PER_M
 )
 
@@ -173,4 +179,115 @@ def test_slice_next_24h_limits_to_24_hours():
     
     result = slice_next_24h(mock_payload, elev_target_m=2000)
     
-    assert len(result) == 24
\ No newline at end of file
+    assert len(result) == 24
+
+def _hourly_payload(hours):
+    return {
+        "hourly": {
+            "time": [f"2025-11-{21 + i // 24:02d}T{i % 24:02d}:00" for i in range(hours)],
+            "temperature_2m": [float(i % 24) - 5 for i in range(hours)],
+            "wind_speed_10m": [10.0 + i % 24 for i in range(hours)],
+            "wind_gusts_10m": [20.0 + i % 24 for i in range(hours)],
+            "precipitation": [0.5] * hours,
+        }
+    }
+
+
+def test_slice_hours_beyond_24():
+    """Test slice_hours returns the requested multi-day horizon."""
+    result = slice_hours(_hourly_payload(72), elev_target_m=2000, hours=48)
+
+    assert len(result) == 48
+    assert result[-1]["time"] == "2025-11-22T23:00"
+
+
+def test_aggregate_forecast_hourly_passthrough():
+    """Test hourly resolution returns rows unchanged."""
+    rows = slice_hours(_hourly_payload(24), elev_target_m=2000, hours=24)
+
+    assert aggregate_forecast(rows, "hourly") is rows
+
+
+def test_aggregate_forecast_daily():
+    """Test daily aggregation groups by date with min/max/sum."""
+    rows = slice_hours(_hourly_payload(48), elev_target_m=2000, hours=48)
+
+    days = aggregate_forecast(rows, "daily")
+
+    assert [d["time"][:10] for d in days] == ["2025-11-21", "2025-11-22"]
+    assert days[0]["hours"] == 24
+    assert days[0]["temp_min_c"] == -5.0
+    assert days[0]["temp_max_c"] == 18.0
+    assert days[0]["wind_gust_max_kmh"] == 43.0
+    assert days[0]["precip_sum_mm"] == 12.0
+    assert days[0]["snow_hours"] == 6
+
+
+def test_aggregate_forecast_three_hourly():
+    """Test 3-hourly aggregation builds 3-hour blocks from the first row."""
+    rows = slice_hours(_hourly_payload(24), elev_target_m=2000, hours=8)
+
+    blocks = aggregate_forecast(rows, "3-hourly")
+
+    assert [b["hours"] for b in blocks] == [3, 3, 2]
+    assert blocks[1]["time"] == "2025-11-21T03:00"
+    assert blocks[1]["temp_max_c"] == 0.0
+
+
+def test_aggregate_forecast_rejects_unknown_resolution():
+    """Test unknown resolution raises ValueError."""
+    with pytest.raises(ValueError):
+        aggregate_forecast([], "weekly")
+
+
+def test_slice_hours_uses_model_elevation():
+    """Test temperatures are corrected from the payload's grid elevation."""
+    payload = _hourly_payload(1)
+    payload["elevation"] = 2000
+
+    summit = slice_hours(payload, elev_target_m=3000, hours=1)[0]
+    base = slice_hours(payload, elev_target_m=1000, hours=1)[0]
+
+    assert summit["temp_c"] == round(-5.0 - 1000 * LAPSE_RATE_K_PER_M, 1)
+    assert base["temp_c"] == round(-5.0 + 1000 * LAPSE_RATE_K_PER_M, 1)
+    assert base["snow_likely"] is False
+    assert summit["snow_likely"] is True
+
+
+def test_cell_point_is_centroid():
+    """Test cell_point returns the rounded centroid of the band points."""
+    points = [{"lat": 42.0, "lon": 0.5}, {"lat": 42.01, "lon": 0.52}, {"lat": 42.02, "lon": 0.54}]
+
+    assert cell_point(points) == (42.01, 0.52)
+
+
+def test_distance_km():
+    """Test great-circle distance: 0.01 degrees of latitude is about 1.1 km."""
+    assert distance_km({"lat": 42.0, "lon": 0.5}, {"lat": 42.01, "lon": 0.5}) == pytest.approx(1.112, abs=0.001)
+
+
+def test_cell_groups_splits_distant_points():
+    """Test points more than CELL_GROUP_KM apart get their own fetch location."""
+    points = {
+        "base": {"lat": 42.60, "lon": 0.60},
+        "mid": {"lat": 42.63, "lon": 0.65},
+        "summit": {"lat": 42.632, "lon": 0.652},
+    }
+
+    assert cell_groups(points) == [((42.6, 0.6), ["base"]), ((42.631, 0.651), ["mid", "summit"])]
+    assert [names for _, names in cell_groups(points, max_km=10)] == [["base", "mid", "summit"]]
+
+
+def test_summarize_forecast():
+    """Test band summary covers the next 24 hours and the full horizon."""
+    rows = slice_hours(_hourly_payload(48), elev_target_m=2000, hours=48)
+
+    summary = summarize_forecast(rows)
+
+    assert summary["next_24h"]["hours"] == 24
+    assert summary["horizon"]["hours"] == 48
+    assert summary["next_24h"]["temp_min_c"] == -5.0
+    assert summary["next_24h"]["temp_max_c"] == 18.0
+    assert summary["next_24h"]["wind_gust_max_kmh"] == 43.0
+    assert summary["horizon"]["precip_total_mm"] == 24.0
+    assert summary["horizon"]["snow_hours"] == 12